@@ -1,21 +1,54 @@
 #!/usr/bin/env python3
 """Simple proxy to expose running agents to the web UI"""
 
-from fastapi import FastAPI, HTTPException
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import httpx
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Tuple
 
-app = FastAPI(title="DevTeam Agent Proxy")
 
-# Enable CORS
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one keep-alive HTTP client across all proxied requests"""
+    # Agents are plain-HTTP uvicorn servers, which cannot speak HTTP/2 (no h2c),
+    # so probes multiplex over pooled HTTP/1.1 keep-alive connections instead
+    app.state.client = httpx.AsyncClient(
+        timeout=2.0,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32)
+    )
+    try:
+        yield
+    finally:
+        for task in list(_refresh_tasks):
+            task.cancel()
+        await app.state.client.aclose()
+
+
+app = FastAPI(
+    title="DevTeam Agent Proxy",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Enable CORS for the web UI; the wildcard is only allowed in development
+if os.environ.get("DEVTEAM_DEV") == "1":
+    allowed_origins = ["*"]
+else:
+    allowed_origins = os.environ.get(
+        "DEVTEAM_UI_ORIGIN", "http://localhost:3000,http://localhost:5173"
+    ).split(",")
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
 # Agent configuration
@@ -27,66 +60,146 @@ AGENTS = [
     {"role": "ba", "port": 8305, "status": "unknown"},
     {"role": "teamlead", "port": 8306, "status": "unknown"}
 ]
+AGENTS_BY_ROLE: Dict[str, Dict[str, Any]] = {a["role"]: a for a in AGENTS}
+
+# Build per-agent URLs and the offline response once instead of on every probe
+for _agent in AGENTS:
+    _agent["_url"] = f"http://localhost:{_agent['port']}"
+    _agent["_ask_url"] = f"{_agent['_url']}/ask"
+    _agent["_offline_response"] = {
+        "role": _agent["role"],
+        "port": _agent["port"],
+        "status": "offline",
+        "url": _agent["_url"]
+    }
+
+# How long a probed status is served before the agent is probed again
+CACHE_TTL = float(os.environ.get("AGENT_STATUS_CACHE_TTL", "2.0"))
+
+# How long an expired status may still be served while it is refreshed in the background
+STALE_TTL = float(os.environ.get("AGENT_STATUS_STALE_TTL", "10.0"))
+
+# Wall-clock budget for the /agents fan-out; slower agents are reported offline
+PROBE_DEADLINE = float(os.environ.get("AGENT_STATUS_DEADLINE", "0.5"))
 
-async def check_agent_status(agent: Dict[str, Any]) -> Dict[str, Any]:
+# How long an agent that failed a probe is reported offline without probing it again
+OFFLINE_BACKOFF = float(os.environ.get("AGENT_OFFLINE_BACKOFF", "5.0"))
+
+# Last probe result per role: (fresh_until, stale_until, status)
+_status_cache: Dict[str, Tuple[float, float, Dict[str, Any]]] = {}
+_refresh_locks: Dict[str, asyncio.Lock] = {}
+_refresh_tasks: Set[asyncio.Task] = set()
+_offline_since: Dict[str, float] = {}
+
+async def check_agent_status(client: httpx.AsyncClient, agent: Dict[str, Any]) -> Dict[str, Any]:
     """Check if an agent is running"""
+    role = agent["role"]
+    failed_at = _offline_since.get(role)
+    if failed_at is not None and time.monotonic() - failed_at < OFFLINE_BACKOFF:
+        return dict(agent["_offline_response"])
+    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://localhost:{agent['port']}/", timeout=2.0)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "role": agent["role"],
-                    "port": agent["port"],
-                    "status": "running",
-                    "url": f"http://localhost:{agent['port']}",
-                    "data": data
-                }
-    except:
+        response = await client.get(agent["_url"])
+        if response.status_code == 200:
+            data = response.json()
+            _offline_since.pop(role, None)
+            return {
+                "role": role,
+                "port": agent["port"],
+                "status": "running",
+                "url": agent["_url"],
+                "data": data
+            }
+    except (httpx.HTTPError, ValueError):
+        # Connection/timeout failures and non-JSON replies both mean the agent is unusable
         pass
     
-    return {
-        "role": agent["role"],
-        "port": agent["port"],
-        "status": "offline",
-        "url": f"http://localhost:{agent['port']}"
-    }
+    _offline_since[role] = time.monotonic()
+    return dict(agent["_offline_response"])
+
+async def refresh_agent_status(client: httpx.AsyncClient, agent: Dict[str, Any]) -> Dict[str, Any]:
+    """Probe an agent and cache the result, one probe per role at a time"""
+    role = agent["role"]
+    async with _refresh_locks.setdefault(role, asyncio.Lock()):
+        # Another request may have refreshed the status while we waited
+        cached = _status_cache.get(role)
+        if cached and time.monotonic() < cached[0]:
+            return cached[2]
+        
+        status = await check_agent_status(client, agent)
+        fresh_until = time.monotonic() + CACHE_TTL
+        _status_cache[role] = (fresh_until, fresh_until + STALE_TTL, status)
+        return status
+
+async def get_agent_status(client: httpx.AsyncClient, agent: Dict[str, Any]) -> Dict[str, Any]:
+    """Get agent status using stale-while-revalidate caching"""
+    role = agent["role"]
+    cached = _status_cache.get(role)
+    now = time.monotonic()
+    if not cached or now >= cached[1]:
+        return await refresh_agent_status(client, agent)
+    
+    lock = _refresh_locks.get(role)
+    if now >= cached[0] and not (lock and lock.locked()):
+        task = asyncio.create_task(refresh_agent_status(client, agent))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    return cached[2]
 
 @app.get("/")
 async def root():
     return {"message": "DevTeam Agent Proxy", "agents_count": len(AGENTS)}
 
+async def get_agent_status_by_deadline(client: httpx.AsyncClient,
+                                      agent: Dict[str, Any]) -> Dict[str, Any]:
+    """Get agent status, reporting the agent offline if it misses PROBE_DEADLINE"""
+    task = asyncio.ensure_future(get_agent_status(client, agent))
+    try:
+        async with asyncio.timeout(PROBE_DEADLINE):
+            return await asyncio.shield(task)
+    except TimeoutError:
+        # Let the late probe finish in the background so its result lands in the cache
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+        return dict(agent["_offline_response"])
+
 @app.get("/agents")
-async def get_agents() -> List[Dict[str, Any]]:
+async def get_agents(response: Response) -> List[Dict[str, Any]]:
     """Get all agents and their current status"""
-    tasks = [check_agent_status(agent) for agent in AGENTS]
-    results = await asyncio.gather(*tasks)
-    return results
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(get_agent_status_by_deadline(app.state.client, agent))
+            for agent in AGENTS
+        ]
+    
+    response.headers["Cache-Control"] = (
+        f"max-age={int(CACHE_TTL)}, stale-while-revalidate={int(STALE_TTL)}"
+    )
+    return [task.result() for task in tasks]
 
 @app.get("/agents/{role}")
 async def get_agent(role: str):
     """Get specific agent info"""
-    agent = next((a for a in AGENTS if a["role"] == role), None)
+    agent = AGENTS_BY_ROLE.get(role)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    return await check_agent_status(agent)
+    return await get_agent_status(app.state.client, agent)
 
 @app.post("/agents/{role}/ask")
 async def ask_agent(role: str, message: dict):
     """Forward a message to an agent"""
-    agent = next((a for a in AGENTS if a["role"] == role), None)
+    agent = AGENTS_BY_ROLE.get(role)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://localhost:{agent['port']}/ask",
-                json=message,
-                timeout=30.0
-            )
-            return response.json()
+        response = await app.state.client.post(
+            agent["_ask_url"],
+            json=message,
+            timeout=30.0
+        )
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Agent communication failed: {str(e)}")
 
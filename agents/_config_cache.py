@@ -0,0 +1,35 @@
+"""Process-wide cache for config files read by the agent runners"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Union
+
+
+@lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+@lru_cache(maxsize=32)
+def _read_text_cached(path: str, mtime_ns: int) -> str:
+    return Path(path).read_text()
+
+
+def load_json(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load a JSON file, re-parsing it only when its mtime changes.
+
+    The cached dict is shared between callers and must not be mutated.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    path = Path(path)
+    return _load_json_cached(str(path), path.stat().st_mtime_ns)
+
+
+def read_text(path: Union[str, Path]) -> str:
+    """Read a text file, re-reading it only when its mtime changes.
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+    path = Path(path)
+    return _read_text_cached(str(path), path.stat().st_mtime_ns)
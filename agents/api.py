@@ -1,8 +1,7 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import uvicorn
 
 from core.claude_agent import ClaudeAgent, AgentSettings, Task, TaskStatus
 
@@ -22,7 +21,10 @@ class TaskRequest(BaseModel):
 class AgentAPI:
     def __init__(self, agent: ClaudeAgent):
         self.agent = agent
-        self.app = FastAPI(title=f"Claude Agent - {agent.settings.role}")
+        self.app = FastAPI(
+            title=f"Claude Agent - {agent.settings.role}",
+            default_response_class=ORJSONResponse
+        )
         self._setup_routes()
         
     def _setup_routes(self):
@@ -62,10 +64,12 @@ class AgentAPI:
         async def get_history():
             return {
                 "task_history": [task.model_dump() for task in self.agent.state.task_history],
-                "message_history": self.agent.state.messages[-50:]  # Last 50 messages
+                # Capped at the last MAX_MESSAGE_HISTORY messages when stored
+                "message_history": list(self.agent.state.messages)
             }
             
     def run(self):
+        import uvicorn
         uvicorn.run(self.app, host="0.0.0.0", port=self.agent.settings.port)
 
 
@@ -2,15 +2,29 @@
 """Base agent implementation for DevTeam"""
 
 import asyncio
+import json
 import logging
+import os
+import socket
 from pathlib import Path
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import uvicorn
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, Optional
+
+from agents._config_cache import load_json
+
+# The Claude and HTTP client libraries are imported on first use, so agent
+# processes that never talk to Claude or Telegram don't pay for them at startup
+if TYPE_CHECKING:
+    import aiohttp
+    import anthropic
 
 logger = logging.getLogger(__name__)
 
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+CLAUDE_MAX_TOKENS = 4096
+
 
 class ChatRequest(BaseModel):
     """Request model for chat/ask endpoints"""
@@ -34,7 +48,14 @@ class BaseAgent:
         self.workspace_path = workspace_path
         # Extract role from agent name (format: role-name)
         self.agent_role = agent_name.split('-')[0] if '-' in agent_name else 'agent'
-        self.app = FastAPI(title=f"DevTeam Agent - {agent_name}")
+        self.app = FastAPI(
+            title=f"DevTeam Agent - {agent_name}",
+            default_response_class=ORJSONResponse
+        )
+        self._anthropic: Optional["anthropic.AsyncAnthropic"] = None
+        self._api_key: Optional[str] = None
+        self._telegram_session: Optional["aiohttp.ClientSession"] = None
+        self._system_prompt: Optional[str] = None
         self._setup_routes()
     
     def _setup_routes(self):
@@ -75,67 +96,42 @@ class BaseAgent:
                     response=f"Error: {str(e)}",
                     agent=self.agent_name
                 )
+        
+        @self.app.post("/ask/stream")
+        async def ask_stream(request: ChatRequest) -> StreamingResponse:
+            """Stream the Claude reply as server-sent events"""
+            async def events():
+                async for text in self.stream_message(
+                    request.message,
+                    request.from_user,
+                    request.context
+                ):
+                    yield f"data: {json.dumps({'text': text})}\n\n"
+                yield "event: done\ndata: {}\n\n"
+            
+            return StreamingResponse(events(), media_type="text/event-stream")
     
     async def process_message(self, message: str, from_user: Optional[str] = None, 
                             context: Optional[Dict[str, Any]] = None) -> str:
         """Process incoming message using Claude API"""
-        import os
-        from anthropic import AsyncAnthropic
-        
         system_prompt = self.get_system_prompt()
         
         logger.info(f"Message from {from_user or 'unknown'}: {message}")
         
-        # Get API key from environment
-        api_key = os.environ.get('ANTHROPIC_API_KEY')
-        if not api_key:
-            # Try to get from app config
-            try:
-                from pathlib import Path
-                import json
-                home_dir = Path(os.environ.get('DEVTEAM_HOME', Path.home() / 'devteam-home'))
-                config_file = home_dir / 'config.json'
-                if config_file.exists():
-                    with open(config_file) as f:
-                        config = json.load(f)
-                        api_key = config.get('tokens', {}).get('anthropic_api_key')
-            except Exception as e:
-                logger.error(f"Failed to load API key from config: {e}")
-        
+        api_key = self._get_api_key()
         if not api_key:
             return f"[{self.agent_name}] Error: No Anthropic API key configured"
         
         try:
-            # Initialize Claude client with custom httpx client to avoid proxy issues
             import anthropic
-            import httpx
-            
-            # Create httpx client without proxy settings
-            http_client = httpx.Client()
-            
-            # Create Anthropic client with custom http client
-            client = anthropic.Anthropic(
-                api_key=api_key,
-                http_client=http_client
-            )
-            
-            # Prepare messages
-            messages = [
-                {
-                    "role": "user",
-                    "content": message
-                }
-            ]
-            
-            # Add context if provided
-            if context:
-                messages[0]["content"] = f"Context: {context}\n\nMessage: {message}"
+            client = self._get_anthropic_client(api_key)
+            messages = self._build_messages(message, context)
             
             # Call Claude API
             try:
-                response = client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
-                    max_tokens=4096,
+                response = await client.messages.create(
+                    model=CLAUDE_MODEL,
+                    max_tokens=CLAUDE_MAX_TOKENS,
                     system=system_prompt,
                     messages=messages
                 )
@@ -150,26 +146,126 @@ class BaseAgent:
                 logger.error(f"Claude API error: {e}")
                 return f"Sorry, I encountered an API error: {str(e)}"
             
-        except ImportError as e:
-            logger.error(f"Failed to import anthropic: {e}")
-            return "Sorry, the Anthropic library is not properly installed."
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             logger.exception("Full traceback:")
             return f"Sorry, I encountered an unexpected error: {type(e).__name__}: {str(e)}"
     
+    async def stream_message(self, message: str, from_user: Optional[str] = None,
+                             context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream the Claude reply text as it is generated.
+        
+        Tool requests in the reply are not executed; use process_message for that.
+        """
+        system_prompt = self.get_system_prompt()
+        
+        logger.info(f"Streaming message from {from_user or 'unknown'}: {message}")
+        
+        api_key = self._get_api_key()
+        if not api_key:
+            yield f"[{self.agent_name}] Error: No Anthropic API key configured"
+            return
+        
+        import anthropic
+        try:
+            client = self._get_anthropic_client(api_key)
+            async with client.messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=CLAUDE_MAX_TOKENS,
+                system=system_prompt,
+                messages=self._build_messages(message, context)
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        except anthropic.APIError as e:
+            logger.error(f"Claude API error: {e}")
+            yield f"Sorry, I encountered an API error: {str(e)}"
+        except Exception as e:
+            logger.exception(f"Unexpected error while streaming: {e}")
+            yield f"Sorry, I encountered an unexpected error: {type(e).__name__}: {str(e)}"
+    
+    def _build_messages(self, message: str,
+                        context: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the Claude message list for a user message"""
+        if context:
+            message = f"Context: {context}\n\nMessage: {message}"
+        return [{"role": "user", "content": message}]
+    
+    def _get_api_key(self) -> Optional[str]:
+        """Resolve the Anthropic API key once and reuse it for later messages"""
+        if self._api_key is not None:
+            return self._api_key
+        
+        # Get API key from environment
+        api_key = os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
+            # Try to get from app config
+            try:
+                home_dir = Path(os.environ.get('DEVTEAM_HOME', Path.home() / 'devteam-home'))
+                config_file = home_dir / 'config.json'
+                if config_file.exists():
+                    with open(config_file) as f:
+                        config = json.load(f)
+                        api_key = config.get('tokens', {}).get('anthropic_api_key')
+            except Exception as e:
+                logger.error(f"Failed to load API key from config: {e}")
+        
+        # A missing key is not cached so it can be configured without a restart
+        self._api_key = api_key or None
+        return self._api_key
+    
+    def _get_anthropic_client(self, api_key: str) -> "anthropic.AsyncAnthropic":
+        """Get the shared Claude client, creating it on first use"""
+        if self._anthropic is None:
+            import anthropic
+            import httpx
+            
+            # Custom httpx client avoids proxy issues and keeps the TLS connection alive
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=4)
+            )
+            self._anthropic = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=http_client
+            )
+        return self._anthropic
+    
+    def _get_telegram_session(self) -> "aiohttp.ClientSession":
+        """Get the shared Telegram session, creating it on first use"""
+        if self._telegram_session is None or self._telegram_session.closed:
+            import ssl
+            import aiohttp
+            import certifi
+            
+            # Verify certificates against certifi's bundle, which also works on macOS
+            ssl_context = ssl.create_default_context(cafile=certifi.where())
+            self._telegram_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, ssl=ssl_context)
+            )
+        return self._telegram_session
+    
+    async def close(self):
+        """Release network resources held by the agent"""
+        if self._anthropic is not None:
+            await self._anthropic.close()
+            self._anthropic = None
+        if self._telegram_session is not None:
+            await self._telegram_session.close()
+            self._telegram_session = None
+    
     def get_system_prompt(self) -> str:
-        """Get system prompt for the agent - to be overridden"""
+        """Get system prompt for the agent, building it only once"""
+        if self._system_prompt is None:
+            self._system_prompt = self.build_system_prompt()
+        return self._system_prompt
+    
+    def build_system_prompt(self) -> str:
+        """Build system prompt for the agent - to be overridden"""
         return f"You are {self.agent_name}, a DevTeam agent."
     
     async def send_startup_message(self):
         """Send startup message to Telegram"""
         try:
-            import aiohttp
-            import os
-            import json
-            from pathlib import Path
-            
             # Get project configuration to find Telegram settings
             project_id = os.environ.get('DEVTEAM_PROJECT_ID')
             home_dir = Path(os.environ.get('DEVTEAM_HOME', Path.home() / 'devteam-home'))
@@ -186,8 +282,7 @@ class BaseAgent:
                 logger.debug(f"Project config not found at {project_config_file}")
                 return
                 
-            with open(project_config_file) as f:
-                project_config = json.load(f)
+            project_config = load_json(project_config_file)
                 
             telegram_config = project_config.get('telegram_config', {})
             if not telegram_config.get('enabled') or not telegram_config.get('bot_token'):
@@ -205,18 +300,18 @@ class BaseAgent:
             # Extract just the agent name (e.g., "Maksimka" from "frontend-Maksimka")
             agent_display_name = self.agent_name.split('-')[-1] if '-' in self.agent_name else self.agent_name
             
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-                payload = {
-                    "chat_id": chat_id,
-                    "text": f"[{project_config.get('project_name', project_id)}] 👋 Hello, I'm {agent_display_name}! Ready to start working :)"
-                }
-                
-                async with session.post(url, json=payload, ssl=False) as response:
-                    if response.status == 200:
-                        logger.info("Sent startup message to Telegram")
-                    else:
-                        logger.warning(f"Failed to send startup message: {response.status}")
+            session = self._get_telegram_session()
+            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+            payload = {
+                "chat_id": chat_id,
+                "text": f"[{project_config.get('project_name', project_id)}] 👋 Hello, I'm {agent_display_name}! Ready to start working :)"
+            }
+            
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    logger.info("Sent startup message to Telegram")
+                else:
+                    logger.warning(f"Failed to send startup message: {response.status}")
                         
         except Exception as e:
             logger.debug(f"Could not send startup message: {e}")
@@ -232,7 +327,15 @@ class BaseAgent:
         # Send startup message
         await self.send_startup_message()
         
+        # Serve on the socket AgentManager already bound for us, if any,
+        # so the port is never free between allocation and startup
+        sockets = None
+        listen_fd = os.environ.pop("AGENT_LISTEN_FD", None)
+        if listen_fd:
+            sockets = [socket.socket(fileno=int(listen_fd))]
+        
         # Run the FastAPI server
+        import uvicorn
         config = uvicorn.Config(
             self.app,
             host="0.0.0.0",
@@ -240,4 +343,7 @@ class BaseAgent:
             log_level="info"
         )
         server = uvicorn.Server(config)
-        await server.serve()
\ No newline at end of file
+        try:
+            await server.serve(sockets=sockets)
+        finally:
+            await self.close()
\ No newline at end of file
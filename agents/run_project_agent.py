@@ -1,42 +1,157 @@
 #!/usr/bin/env python3
 """Run an agent with project context"""
 
+import atexit
+import io
 import os
+import queue
+import re
 import sys
+import time
 import asyncio
+from itertools import islice
 from pathlib import Path
 import json
 import logging
-from typing import Dict, Any, Optional
+import logging.handlers
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from agents._config_cache import read_text
 from agents.base_agent import BaseAgent
 from core.app_config import AppConfig
 from core.project_config import ProjectConfig
 from core.agent_tools import AgentTools
-from core.git_helper import GitHelper
+from core.git_helper import GitHelper, get_git_helper
 
 
+# Start of a tool request object; captures the tool name when it is a plain string
+_TOOL_START = re.compile(r'\{\s*"tool"\s*:\s*(?:"([^"\\]*)")?')
+
+# strict=False accepts the raw newlines/tabs Claude often leaves inside "content" strings
+_DECODER = json.JSONDecoder(strict=False)
+
+# Tools without side effects; consecutive requests for these run concurrently
+PARALLEL_SAFE_TOOLS = frozenset({
+    "read_file", "list_files", "get_file_info", "get_files_info", "search_files", "get_branch_status"
+})
+
+# Tools that can change the working tree or branch; they invalidate the cached git status
+GIT_STATE_TOOLS = frozenset({
+    "write_file", "execute_command", "create_branch", "commit_changes", "push_branch"
+})
+
+# Maximum number of list_files entries echoed back in a reply
+LIST_FILES_LIMIT = 20
+
+# How long a git branch status result is reused, in seconds
+BRANCH_STATUS_TTL = float(os.environ.get('AGENT_BRANCH_STATUS_TTL', '2.0'))
+
+# Resolved once at import; Path.home() looks up the passwd database on POSIX
+DEVTEAM_HOME = Path(os.environ.get('DEVTEAM_HOME', Path.home() / 'devteam-home'))
+
 logging.basicConfig(level=logging.INFO)
+# Thread and process details are not in any format string; skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
 # Set up command logger - logs only commands executed by the agent
 command_logger = logging.getLogger('agent_commands')
+# delay=True opens the file on the first command rather than at import
 command_handler = logging.FileHandler(
-    Path.home() / 'devteam-home' / 'logs' / 'agent_commands.log'
+    DEVTEAM_HOME / 'logs' / 'agent_commands.log', delay=True
 )
 command_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-command_logger.addHandler(command_handler)
+# Writes happen on a listener thread so tool dispatch never waits on the log file
+_command_log_queue = queue.SimpleQueue()
+command_logger.addHandler(logging.handlers.QueueHandler(_command_log_queue))
+_command_log_listener = logging.handlers.QueueListener(_command_log_queue, command_handler)
+_command_log_listener.start()
+atexit.register(_command_log_listener.stop)
 command_logger.setLevel(logging.INFO)
 
 
+def _scan_tool_requests(response: str) -> Tuple[List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]], str]:
+    """Find the tool requests in a reply, returning them with the surrounding text
+    
+    Entries are (prefix, tool_request, tool_name), where prefix is the stripped
+    text before the request and tool_request is None when the candidate is not
+    valid JSON. The second value is the stripped text after the last request.
+    """
+    # raw_decode parses each candidate in C and reports where it ends, so
+    # multi-line JSON needs no hand-written brace matching. Raw newlines in
+    # "content" strings are accepted by the lenient decoder as they are, so
+    # well-formed and sloppy requests alike are parsed in a single attempt.
+    # The search resumes after each decoded request, so large write_file
+    # contents are not scanned again.
+    entries = []
+    current_pos = 0
+    text_start = 0
+    while True:
+        match = _TOOL_START.search(response, current_pos)
+        if match is None:
+            break
+        start = match.start()
+        prefix = response[text_start:start].strip()
+        try:
+            tool_request, end = _DECODER.raw_decode(response, start)
+        except json.JSONDecodeError as e:
+            logger.error("JSON decode error at offset %d: %s", start, e)
+            # Drop the malformed request: skip to the first closing brace after
+            # the error, without running past the next request
+            entries.append((prefix, None, match.group(1)))
+            next_match = _TOOL_START.search(response, match.end())
+            limit = next_match.start() if next_match else len(response)
+            close = response.find("}", min(e.pos, limit), limit)
+            text_start = current_pos = close + 1 if close != -1 else limit
+            continue
+        entries.append((prefix, tool_request, tool_request.get("tool")))
+        text_start = current_pos = end
+    return entries, response[text_start:].strip()
+
+
+def _write_line(buf: io.StringIO, text: str) -> None:
+    """Write text to buf, separated from any earlier output by a newline"""
+    if buf.tell():
+        buf.write("\n")
+    buf.write(text)
+
+
 class ProjectAgent(BaseAgent):
     """Agent that operates within a project context"""
     
+    # Synchronous tool implementations; execute_tool runs them in a worker thread
+    _TOOL_HANDLERS: Dict[str, Callable[["ProjectAgent", Dict[str, Any]], Any]] = {
+        "read_file": lambda self, p: self.tools.read_file(p["path"]),
+        "write_file": lambda self, p: self.tools.write_file(p["path"], p["content"]),
+        "list_files": lambda self, p: self.tools.list_files(p.get("directory", ".")),
+        "execute_command": lambda self, p: self.tools.execute_command(p["command"], p.get("cwd")),
+        "search_files": lambda self, p: self.tools.search_files(p["pattern"], p.get("file_pattern", "*")),
+        "get_file_info": lambda self, p: self.tools.get_file_info(p["path"]),
+        "get_files_info": lambda self, p: self.tools.get_files_info(p["paths"]),
+        "create_branch": lambda self, p: self._create_branch(p),
+        "commit_changes": lambda self, p: self.git_helper.commit_changes(
+            p["title"], p["description"], self.role, p.get("task_id", "task")
+        ),
+        "push_branch": lambda self, p: self.git_helper.push_branch(p.get("branch_name")),
+    }
+    
+    # Commands written to the command log before a tool runs, as (format, *args)
+    _TOOL_COMMAND_LOGS: Dict[str, Callable[[Dict[str, Any]], List[Tuple[Any, ...]]]] = {
+        "write_file": lambda p: [("write_file %s", p["path"])],
+        "execute_command": lambda p: [("$ %s", p["command"])],
+        "commit_changes": lambda p: [("git add .",), ("git commit -m '%s'", p["title"])],
+        "push_branch": lambda p: [("git push -u origin %s", p.get("branch_name", "current"))],
+        "get_branch_status": lambda p: [("git status",)],
+    }
+    
     def __init__(self, project_id: str, agent_id: str, role: str, name: str, 
-                 app_config: AppConfig, project_config: ProjectConfig):
+                 app_config: AppConfig, project_config: ProjectConfig,
+                 tools: Optional[AgentTools] = None, git_helper: Optional[GitHelper] = None):
         self.project_id = project_id
         self.agent_id = agent_id
         self.role = role
@@ -50,25 +165,10 @@ class ProjectAgent(BaseAgent):
         # Get port from environment or default
         port = int(os.environ.get('AGENT_PORT', '8301'))
         
-        # Get the actual project source location (where git repo is)
-        project_src = project_config.config_path.parent / "agents" / agent_id
-        
-        # Load agent configuration
-        agent_config = project_config.get_agent_configuration(agent_id)
-        
-        # Initialize tools with the project source directory and allowed paths/commands
-        self.tools = AgentTools(
-            str(project_src),
-            allowed_paths=agent_config.permissions.allowed_paths,
-            allowed_commands=agent_config.permissions.allowed_commands
-        )
-        
-        # Initialize git helper with project config
-        git_config = {
-            "default_branch": project_config.repository.base_branch,
-            "remote_url": project_config.repository.url
-        }
-        self.git_helper = GitHelper(str(project_src), git_config)
+        # Tools and git helper may be pre-built by create()
+        self.tools = tools or self._build_tools(project_config, agent_id)
+        self.git_helper = git_helper or self._build_git_helper(project_config, agent_id)
+        self._branch_status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         
         super().__init__(
             agent_name=f"{role}-{name}",
@@ -78,19 +178,16 @@ class ProjectAgent(BaseAgent):
         
         # Add enhanced status endpoint after initialization
         # Remove the existing status route
-        routes_to_remove = []
-        for i, route in enumerate(self.app.routes):
-            if hasattr(route, 'path') and route.path == "/status" and hasattr(route, 'methods') and "GET" in route.methods:
-                routes_to_remove.append(i)
-        
-        # Remove in reverse order to maintain indices
-        for i in reversed(routes_to_remove):
-            self.app.routes.pop(i)
+        self.app.router.routes = [
+            route for route in self.app.router.routes
+            if not (getattr(route, 'path', None) == "/status"
+                    and "GET" in (getattr(route, 'methods', None) or ()))
+        ]
         
         # Add our enhanced status endpoint
         @self.app.get("/status")
         async def status():
-            branch_info = self.git_helper.get_branch_status()
+            branch_info = await self.get_branch_status()
             return {
                 "agent": self.agent_name,
                 "status": "healthy",
@@ -99,13 +196,51 @@ class ProjectAgent(BaseAgent):
                 "has_changes": branch_info.get("has_uncommitted_changes", False)
             }
     
+    @classmethod
+    async def create(cls, project_id: str, agent_id: str, role: str, name: str,
+                     app_config: AppConfig, project_config: ProjectConfig) -> "ProjectAgent":
+        """Create an agent, building its tools and git helper concurrently off the event loop"""
+        tools, git_helper = await asyncio.gather(
+            asyncio.to_thread(cls._build_tools, project_config, agent_id),
+            asyncio.to_thread(cls._build_git_helper, project_config, agent_id)
+        )
+        return cls(project_id, agent_id, role, name, app_config, project_config,
+                   tools=tools, git_helper=git_helper)
+    
+    @staticmethod
+    def _project_src(project_config: ProjectConfig, agent_id: str) -> Path:
+        # The actual project source location (where git repo is)
+        return project_config.config_path.parent / "agents" / agent_id
+    
+    @staticmethod
+    def _build_tools(project_config: ProjectConfig, agent_id: str) -> AgentTools:
+        # Initialize tools with the project source directory and allowed paths/commands
+        agent_config = project_config.get_agent_configuration(agent_id)
+        return AgentTools(
+            str(ProjectAgent._project_src(project_config, agent_id)),
+            allowed_paths=agent_config.permissions.allowed_paths,
+            allowed_commands=agent_config.permissions.allowed_commands
+        )
+    
+    @staticmethod
+    def _build_git_helper(project_config: ProjectConfig, agent_id: str) -> GitHelper:
+        # Initialize git helper with project config; this runs git config subprocesses
+        git_config = {
+            "default_branch": project_config.repository.base_branch,
+            "remote_url": project_config.repository.url
+        }
+        return get_git_helper(str(ProjectAgent._project_src(project_config, agent_id)), git_config)
+    
     def get_system_prompt(self) -> str:
         """Get system prompt with project context"""
-        # Load CLAUDE.md from agent workspace
-        claude_md_path = self.workspace_path / "CLAUDE.md"
-        if claude_md_path.exists():
-            return claude_md_path.read_text()
-        
+        # Load CLAUDE.md from agent workspace; re-read only when its mtime changes
+        try:
+            return read_text(self.workspace_path / "CLAUDE.md")
+        except FileNotFoundError:
+            return super().get_system_prompt()
+    
+    def build_system_prompt(self) -> str:
+        """Build the default project prompt used when there is no CLAUDE.md"""
         # Get the actual project source code location
         project_src = self.project_config.config_path.parent / "agents" / self.agent_id
         
@@ -127,6 +262,7 @@ You have access to the following tools:
    - Write files: {{"tool": "write_file", "path": "path/to/file", "content": "content"}}
    - List files: {{"tool": "list_files", "directory": "path/to/dir"}}
    - Get file info: {{"tool": "get_file_info", "path": "path/to/file"}}
+   - Get info for several files: {{"tool": "get_files_info", "paths": ["path/to/a", "path/to/b"]}}
 
 2. Command Execution:
    - Execute commands: {{"tool": "execute_command", "command": "git status"}}
@@ -159,227 +295,178 @@ You are part of a multi-agent development team. Work collaboratively and communi
         # First get the base response
         response = await super().process_message(message, from_user, context)
         
-        logger.info(f"Raw response from Claude (length: {len(response)}):\n{response}")
+        logger.info("Raw response from Claude (length: %d):\n%s", len(response), response)
+        
+        # Plain replies skip the scan entirely
+        if '"tool"' not in response:
+            return response
         
         # Check if response contains tool requests
         tool_executed = False
-        final_response_lines = []
+        final_response = io.StringIO()
         
-        # For multi-line JSON, we need a more sophisticated approach
-        import re
+        potential_jsons, remaining = _scan_tool_requests(response)
         
-        # Find all potential JSON tool requests
-        potential_jsons = []
-        
-        # Pattern to find JSON tool requests - now handles multi-line
-        current_pos = 0
-        while True:
-            start = response.find('{"tool":', current_pos)
-            if start == -1:
-                break
-                
-            # Find the matching closing brace
-            brace_count = 0
-            in_string = False
-            escape_next = False
-            end = start
-            
-            for i in range(start, len(response)):
-                char = response[i]
-                
-                if escape_next:
-                    escape_next = False
-                    continue
-                    
-                if char == '\\':
-                    escape_next = True
-                    continue
-                    
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    
-                if not in_string:
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end = i + 1
-                            potential_jsons.append((start, end, response[start:end]))
-                            break
-            
-            current_pos = end if end > start else start + 1
-        
-        # Process the response, executing tools as we find them
-        last_end = 0
-        for json_start, json_end, json_str in potential_jsons:
+        # Execute the tools, then format the results in their original order
+        results = await self.execute_tool_requests([entry[1] for entry in potential_jsons])
+        for (prefix, tool_request, tool_name), result in zip(potential_jsons, results):
             # Add any text before this JSON
-            if json_start > last_end:
-                prefix = response[last_end:json_start].strip()
-                if prefix:
-                    final_response_lines.append(prefix)
+            if prefix:
+                _write_line(final_response, prefix)
+            
+            if tool_request is None:
+                if tool_name:
+                    _write_line(final_response, f"\n⚠️ Failed to parse {tool_name} tool request (JSON error)")
+                else:
+                    _write_line(final_response, f"\n⚠️ Failed to parse tool request (JSON error)")
+                continue
             
             try:
-                # Try to fix common JSON issues before parsing
-                # Handle unescaped newlines in content by looking for common patterns
-                if '"content":' in json_str:
-                    # Extract the content part more carefully
-                    import re
-                    # Match content field with proper handling of nested quotes
-                    content_match = re.search(r'"content"\s*:\s*"((?:[^"\\]|\\.)*)"', json_str, re.DOTALL)
-                    if content_match:
-                        original_content = content_match.group(1)
-                        # Check if content has unescaped newlines
-                        if '\n' in original_content and '\\n' not in original_content:
-                            # Replace actual newlines with escaped ones
-                            fixed_content = original_content.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                            json_str = json_str.replace(original_content, fixed_content)
-                
-                tool_request = json.loads(json_str)
                 if "tool" in tool_request:
-                    logger.info(f"Executing tool: {tool_request['tool']}")
-                    result = await self.execute_tool(
-                        tool_request["tool"], 
-                        tool_request
-                    )
-                    logger.info(f"Tool result: {result}")
+                    logger.info("Tool result: %s", result)
                     tool_executed = True
                     
                     # Format tool result
                     if tool_request["tool"] == "execute_command":
                         if result.get("success"):
                             if result.get("stdout"):
-                                final_response_lines.append(f"\n```\n{result['stdout'].strip()}\n```")
+                                _write_line(final_response, f"\n```\n{result['stdout'].strip()}\n```")
                             else:
-                                final_response_lines.append("\n✓ Command executed successfully")
+                                _write_line(final_response, "\n✓ Command executed successfully")
                         else:
                             error_msg = result.get("stderr", result.get("error", "Unknown error"))
-                            final_response_lines.append(f"\n⚠️ Command failed: {error_msg}")
+                            _write_line(final_response, f"\n⚠️ Command failed: {error_msg}")
                     elif tool_request["tool"] == "list_files":
                         if isinstance(result, list):
-                            final_response_lines.append("\nFiles found:")
-                            for f in result[:20]:  # Limit output
-                                final_response_lines.append(f"  - {f}")
-                            if len(result) > 20:
-                                final_response_lines.append(f"  ... and {len(result) - 20} more files")
+                            # Limit output to the first LIST_FILES_LIMIT entries
+                            shown = "".join(f"\n  - {f}" for f in islice(result, LIST_FILES_LIMIT))
+                            _write_line(final_response, f"\nFiles found:{shown}")
+                            if len(result) > LIST_FILES_LIMIT:
+                                _write_line(final_response, f"  ... and {len(result) - LIST_FILES_LIMIT} more files")
                         else:
-                            final_response_lines.append(f"\n{result}")
+                            _write_line(final_response, f"\n{result}")
                     elif tool_request["tool"] == "write_file":
                         if isinstance(result, str) and "written" in result:
-                            final_response_lines.append(f"\n✓ {result}")
+                            _write_line(final_response, f"\n✓ {result}")
                         else:
-                            final_response_lines.append(f"\n⚠️ Write failed: {result}")
+                            _write_line(final_response, f"\n⚠️ Write failed: {result}")
                     elif tool_request["tool"] == "create_branch":
                         # Store the actual branch name for later use
                         if isinstance(result, str):
                             self._current_branch = result
-                            final_response_lines.append(f"\n🌿 Created new branch: {result}")
-                            final_response_lines.append(f"📍 Switched to branch: {result}")
+                            _write_line(final_response, f"\n🌿 Created new branch: {result}")
+                            _write_line(final_response, f"📍 Switched to branch: {result}")
                         else:
-                            final_response_lines.append(f"\n⚠️ Branch creation failed: {result}")
+                            _write_line(final_response, f"\n⚠️ Branch creation failed: {result}")
                     elif tool_request["tool"] == "commit_changes":
                         if result is True:
-                            final_response_lines.append(f"\n✓ Changes committed successfully")
+                            _write_line(final_response, f"\n✓ Changes committed successfully")
                         else:
-                            final_response_lines.append(f"\n⚠️ No changes to commit")
+                            _write_line(final_response, f"\n⚠️ No changes to commit")
                     elif tool_request["tool"] == "push_branch":
                         if result is True:
                             branch = tool_request.get("branch_name", self._current_branch if hasattr(self, '_current_branch') else "current branch")
-                            final_response_lines.append(f"\n✓ Pushed branch '{branch}' to remote")
+                            _write_line(final_response, f"\n✓ Pushed branch '{branch}' to remote")
                         else:
-                            final_response_lines.append(f"\n⚠️ Failed to push branch")
+                            _write_line(final_response, f"\n⚠️ Failed to push branch")
                     elif tool_request["tool"] == "get_branch_status":
                         if isinstance(result, dict) and "current_branch" in result:
-                            final_response_lines.append(f"\n🌿 Current branch: {result['current_branch']}")
+                            _write_line(final_response, f"\n🌿 Current branch: {result['current_branch']}")
                             if result.get("has_uncommitted_changes"):
-                                final_response_lines.append("🔴 Has uncommitted changes")
+                                _write_line(final_response, "🔴 Has uncommitted changes")
                             else:
-                                final_response_lines.append("🟢 Working tree clean")
+                                _write_line(final_response, "🟢 Working tree clean")
                         else:
-                            final_response_lines.append(f"\n{result}")
+                            _write_line(final_response, f"\n{result}")
                     else:
                         # For other tools, format appropriately
                         if isinstance(result, dict) and "error" in result:
-                            final_response_lines.append(f"\n⚠️ {result['error']}")
+                            _write_line(final_response, f"\n⚠️ {result['error']}")
                         else:
-                            final_response_lines.append(f"\n{result}")
-                    
-                    last_end = json_end
+                            _write_line(final_response, f"\n{result}")
                     
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
-                logger.error(f"Failed JSON string: {json_str}")
-                # Try to extract just the tool name for a partial execution message
-                import re
-                tool_match = re.search(r'"tool"\s*:\s*"([^"]+)"', json_str)
-                if tool_match:
-                    tool_name = tool_match.group(1)
-                    final_response_lines.append(f"\n⚠️ Failed to parse {tool_name} tool request (JSON error)")
-                else:
-                    final_response_lines.append(f"\n⚠️ Failed to parse tool request (JSON error)")
-                last_end = json_end
             except Exception as e:
-                logger.error(f"Tool execution error: {e}")
-                final_response_lines.append(f"\n⚠️ Tool error: {str(e)}")
-                last_end = json_end
+                logger.error("Tool execution error: %s", e)
+                _write_line(final_response, f"\n⚠️ Tool error: {str(e)}")
         
         # Add any remaining text after the last JSON
-        if last_end < len(response):
-            remaining = response[last_end:].strip()
-            if remaining:
-                final_response_lines.append(remaining)
+        if remaining:
+            _write_line(final_response, remaining)
         
         # If no tools were found, return the original response
         if not tool_executed:
             return response
             
-        return '\n'.join(final_response_lines)
+        return final_response.getvalue()
+    
+    async def get_branch_status(self) -> Dict[str, Any]:
+        """Get git branch status, reusing results younger than BRANCH_STATUS_TTL"""
+        cached = self._branch_status_cache
+        if cached is not None and time.monotonic() - cached[0] < BRANCH_STATUS_TTL:
+            return cached[1]
+        result = await asyncio.to_thread(self.git_helper.get_branch_status)
+        self._branch_status_cache = (time.monotonic(), result)
+        return result
+    
+    async def execute_tool_requests(self, tool_requests: List[Optional[Dict[str, Any]]]) -> List[Any]:
+        """Execute tool requests in order, gathering runs of side-effect-free tools"""
+        results = []
+        batch = []
+        for tool_request in tool_requests:
+            tool = tool_request.get("tool") if tool_request is not None else None
+            # Non-string tool names go down the serial path to get the usual error
+            if isinstance(tool, str) and tool in PARALLEL_SAFE_TOOLS:
+                batch.append(tool_request)
+                continue
+            if batch:
+                results.extend(await asyncio.gather(*(self._run_tool_request(t) for t in batch)))
+                batch = []
+            # Requests that failed to parse keep their slot with a None result
+            results.append(await self._run_tool_request(tool_request) if tool_request is not None else None)
+        if batch:
+            results.extend(await asyncio.gather(*(self._run_tool_request(t) for t in batch)))
+        return results
+    
+    async def _run_tool_request(self, tool_request: Dict[str, Any]) -> Any:
+        logger.info("Executing tool: %s", tool_request["tool"])
+        return await self.execute_tool(tool_request["tool"], tool_request)
+    
+    def _create_branch(self, params: Dict[str, Any]) -> str:
+        branch_name = self.git_helper.create_feature_branch(
+            self.role,
+            params.get("task_id", "task"),
+            params.get("task_title")
+        )
+        command_logger.info("[%s] git checkout -b %s", self.name, branch_name)
+        return branch_name
     
     async def execute_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
         """Execute a tool with given parameters"""
         try:
-            if tool_name == "read_file":
-                return self.tools.read_file(params["path"])
-            elif tool_name == "write_file":
-                command_logger.info(f"[{self.name}] write_file {params['path']}")
-                return self.tools.write_file(params["path"], params["content"])
-            elif tool_name == "list_files":
-                return self.tools.list_files(params.get("directory", "."))
-            elif tool_name == "execute_command":
-                command_logger.info(f"[{self.name}] $ {params['command']}")
-                return self.tools.execute_command(params["command"], params.get("cwd"))
-            elif tool_name == "search_files":
-                return self.tools.search_files(params["pattern"], params.get("file_pattern", "*"))
-            elif tool_name == "get_file_info":
-                return self.tools.get_file_info(params["path"])
-            elif tool_name == "create_branch":
-                branch_name = self.git_helper.create_feature_branch(
-                    self.role,
-                    params.get("task_id", "task"),
-                    params.get("task_title")
-                )
-                command_logger.info(f"[{self.name}] git checkout -b {branch_name}")
-                return branch_name
-            elif tool_name == "commit_changes":
-                command_logger.info(f"[{self.name}] git add .")
-                command_logger.info(f"[{self.name}] git commit -m '{params['title']}'")
-                return self.git_helper.commit_changes(
-                    params["title"],
-                    params["description"],
-                    self.role,
-                    params.get("task_id", "task")
-                )
-            elif tool_name == "push_branch":
-                branch = params.get("branch_name", "current")
-                command_logger.info(f"[{self.name}] git push -u origin {branch}")
-                return self.git_helper.push_branch(params.get("branch_name"))
-            elif tool_name == "get_branch_status":
-                command_logger.info(f"[{self.name}] git status")
-                return self.git_helper.get_branch_status()
-            else:
+            # Tool names come from model output and may be any JSON value
+            if not isinstance(tool_name, str):
                 raise ValueError(f"Unknown tool: {tool_name}")
+            command_log = self._TOOL_COMMAND_LOGS.get(tool_name)
+            if command_log and command_logger.isEnabledFor(logging.INFO):
+                for command, *args in command_log(params):
+                    command_logger.info("[%s] " + command, self.name, *args)
+            
+            if tool_name == "get_branch_status":
+                # Served from the short-lived status cache
+                return await self.get_branch_status()
+            
+            handler = self._TOOL_HANDLERS.get(tool_name)
+            if handler is None:
+                raise ValueError(f"Unknown tool: {tool_name}")
+            # Tools block on disk I/O or git subprocesses, so run them in the
+            # default thread pool to keep the event loop serving other requests
+            return await asyncio.to_thread(handler, self, params)
         except Exception as e:
             return {"error": str(e)}
+        finally:
+            # Drop git status cached before or while the tool changed the tree
+            if isinstance(tool_name, str) and tool_name in GIT_STATE_TOOLS:
+                self._branch_status_cache = None
 
 
 async def main():
@@ -389,7 +476,7 @@ async def main():
     agent_id = os.environ.get('DEVTEAM_AGENT_ID')
     role = os.environ.get('DEVTEAM_AGENT_ROLE')
     name = os.environ.get('DEVTEAM_AGENT_NAME')
-    home_dir = Path(os.environ.get('DEVTEAM_HOME', Path.home() / 'devteam-home'))
+    home_dir = DEVTEAM_HOME
     
     if not all([project_id, agent_id, role, name]):
         logger.error("Missing required environment variables")
@@ -397,7 +484,7 @@ async def main():
     
     try:
         # Load configurations
-        app_config = AppConfig.load(home_dir)
+        app_config = await asyncio.to_thread(AppConfig.load, home_dir)
         if not app_config:
             logger.error(f"Failed to load app config from {home_dir}")
             sys.exit(1)
@@ -409,14 +496,14 @@ async def main():
             
         project_info = app_config.projects[project_id]
         project_path = app_config.home_directory / project_info.path
-        project_config = ProjectConfig.load(project_path)
+        project_config = await asyncio.to_thread(ProjectConfig.load, project_path)
         
         if not project_config:
             logger.error(f"Failed to load project config from {project_path}")
             sys.exit(1)
         
         # Create and run agent
-        agent = ProjectAgent(
+        agent = await ProjectAgent.create(
             project_id=project_id,
             agent_id=agent_id,
             role=role,
@@ -436,4 +523,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvicorn only selects uvloop for event loops it creates itself; this
+    # agent starts its own loop, so opt in here when uvloop is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
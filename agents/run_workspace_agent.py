@@ -11,10 +11,8 @@ import logging
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from agents.api import AgentAPI
-from core.claude_agent import ClaudeAgent, AgentSettings, AgentRole
+from agents._config_cache import read_text
 from core.workspace_config import WorkspaceConfig
-from config.settings import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,16 +41,20 @@ def main():
         logger.error(f"Please create the {role} agent workspace first")
         sys.exit(1)
     
-    # Check for CLAUDE.md
+    # Load CLAUDE.md content
     claude_md_path = agent_repo_path / "CLAUDE.md"
-    if not claude_md_path.exists():
+    try:
+        claude_content = read_text(claude_md_path)
+    except FileNotFoundError:
         logger.error(f"CLAUDE.md not found at {claude_md_path}")
         sys.exit(1)
-    
-    # Load CLAUDE.md content
-    claude_content = claude_md_path.read_text()
     logger.info(f"Loaded CLAUDE.md for {role} agent")
     
+    # Deferred until the workspace checks pass so error exits stay fast
+    from agents.api import AgentAPI
+    from core.claude_agent import ClaudeAgent, AgentSettings, AgentRole
+    from config.settings import settings
+    
     # Create agent settings
     agent_settings = AgentSettings(
         role=AgentRole[role.upper()],
@@ -3,21 +3,49 @@
 
 import os
 import sys
-import json
+import re
+import time
+import asyncio
+import hashlib
+import orjson
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import aiofiles
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from agents._config_cache import load_json
 from core.claude_agent import ClaudeAgent, AgentSettings, AgentRole
 from core.agent_tools import AgentTools
-from core.git_helper import GitHelper
-from config.settings import settings
-import uvicorn
+from core.git_helper import GitHelper, get_git_helper
+
+
+# Tool directive on its own line: TOOL:toolname:{json params}
+_TOOL_RE = re.compile(r'^TOOL:([^:\n]+):(.*)$', re.MULTILINE)
+
+# Read-only tools that can run concurrently when a reply requests several in a row
+PARALLEL_SAFE_TOOLS = frozenset({"read_file", "list_files", "search_files", "get_file_info"})
+
+# Chunk size for the streaming file endpoints
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Seconds a reply is reused for an identical message, such as a client retry.
+# Off by default: a cache hit skips the model, so the conversation never sees the turn
+RESPONSE_CACHE_TTL = float(os.environ.get('AGENT_RESPONSE_CACHE_TTL', '0'))
+
+# Maximum number of replies kept in the response cache
+RESPONSE_CACHE_SIZE = 128
+
+
+class AskRequest(BaseModel):
+    message: str = ""
+    context: Dict[str, Any] = Field(default_factory=dict)
 
 
 class ToolRequest(BaseModel):
@@ -34,89 +62,141 @@ class ToolResponse(BaseModel):
 class ToolEnabledAgent:
     """Agent with file system tools"""
     
-    def __init__(self, agent: ClaudeAgent, workspace_path: str, git_config: Dict[str, Any]):
+    def __init__(self, agent: ClaudeAgent, workspace_path: str, git_config: Dict[str, Any],
+                 max_file_size_mb: int = 10):
         self.agent = agent
         self.tools = AgentTools(workspace_path)
-        self.git_helper = GitHelper(workspace_path, git_config)
         self.workspace_path = workspace_path
+        self._git_config = git_config
+        self._git_helper: Optional[GitHelper] = None
+        self.max_file_size = max_file_size_mb * 1024 * 1024
+        self._response_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        
+        # The agent's role is fixed for its lifetime, so resolve it once
+        role = agent.settings.role.value
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "read_file": self._read_file,
+            "write_file": self._write_file,
+            "list_files": lambda p: self.tools.list_files(p.get("directory", ".")),
+            "execute_command": lambda p: self.tools.execute_command(p["command"], p.get("cwd")),
+            "search_files": lambda p: self.tools.search_files(p["pattern"], p.get("file_pattern", "*")),
+            "get_file_info": lambda p: self.tools.get_file_info(p["path"]),
+            "create_branch": lambda p: self.git_helper.create_feature_branch(
+                role, p.get("task_id", "task"), p.get("task_title")
+            ),
+            "commit_changes": lambda p: self.git_helper.commit_changes(
+                p["title"], p["description"], role, p.get("task_id", "task")
+            ),
+            "push_branch": lambda p: self.git_helper.push_branch(p["branch_name"]),
+        }
         
+    @property
+    def git_helper(self) -> GitHelper:
+        """Git helper for the workspace, set up on the first git tool call"""
+        if self._git_helper is None:
+            self._git_helper = get_git_helper(self.workspace_path, self._git_config)
+        return self._git_helper
+    
+    def _read_file(self, params: Dict[str, Any]) -> str:
+        """Read a file in memory, pointing large files at the streaming endpoint"""
+        path = self.tools.resolve_path(params["path"])
+        if path.is_file() and path.stat().st_size > self.max_file_size:
+            raise ValueError(f"File too large to read inline: {path}. Use /tools/read_file_stream")
+        return self.tools.read_file(params["path"])
+    
+    def _write_file(self, params: Dict[str, Any]) -> str:
+        """Write a file from memory, pointing large files at the streaming endpoint"""
+        content = params["content"]
+        if len(content.encode("utf-8")) > self.max_file_size:
+            raise ValueError("Content too large to write inline. Use /tools/write_file_stream")
+        return self.tools.write_file(params["path"], content)
+    
     async def process_with_tools(self, message: str) -> str:
         """Process message and handle tool requests"""
+        # Replies depend on the conversation so far, so only a recent identical
+        # message gets the cached reply. Replies that ran tools are never cached,
+        # since their results depend on the current state of the workspace
+        if RESPONSE_CACHE_TTL > 0:
+            key = hashlib.blake2b(message.encode(), digest_size=16).digest()
+            cached = self._response_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < RESPONSE_CACHE_TTL:
+                self._response_cache.move_to_end(key)
+                return cached[1]
+        
         # First, get the agent's response
         response = await self.agent.process_message(message)
         
         # Check if the response contains tool requests
         # For now, we'll use a simple format: TOOL:toolname:params
+        calls = []
         if "TOOL:" in response:
-            tool_results = []
-            lines = response.split('\n')
+            for match in _TOOL_RE.finditer(response):
+                tool_name, params_str = match.groups()
+                try:
+                    calls.append((tool_name, orjson.loads(params_str)))
+                except orjson.JSONDecodeError as e:
+                    calls.append((tool_name, e))
             
-            for line in lines:
-                if line.startswith("TOOL:"):
-                    try:
-                        _, tool_name, params_str = line.split(":", 2)
-                        params = json.loads(params_str)
-                        result = await self.execute_tool(tool_name, params)
-                        tool_results.append(f"Result of {tool_name}: {result}")
-                    except Exception as e:
-                        tool_results.append(f"Error executing {tool_name}: {str(e)}")
+            tool_results = []
+            for (tool_name, params), result in zip(calls, await self.execute_tools(calls)):
+                if isinstance(params, Exception):
+                    tool_results.append(f"Error executing {tool_name}: {str(params)}")
+                else:
+                    tool_results.append(f"Result of {tool_name}: {result}")
             
             # Append tool results to response
             if tool_results:
                 response += "\n\n--- Tool Results ---\n" + "\n".join(tool_results)
+        
+        if RESPONSE_CACHE_TTL > 0 and not calls:
+            self._response_cache[key] = (time.monotonic(), response)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
                 
         return response
     
+    async def execute_tools(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """Execute tool calls in order, gathering runs of side-effect-free tools"""
+        results = []
+        batch = []
+        for tool_name, params in calls:
+            if tool_name in PARALLEL_SAFE_TOOLS and not isinstance(params, Exception):
+                batch.append(self.execute_tool(tool_name, params))
+                continue
+            if batch:
+                results.extend(await asyncio.gather(*batch))
+                batch = []
+            # Calls whose params failed to parse keep their slot with a None result
+            results.append(None if isinstance(params, Exception) else await self.execute_tool(tool_name, params))
+        if batch:
+            results.extend(await asyncio.gather(*batch))
+        return results
+    
     async def execute_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
         """Execute a tool with given parameters"""
         try:
-            if tool_name == "read_file":
-                return self.tools.read_file(params["path"])
-            elif tool_name == "write_file":
-                return self.tools.write_file(params["path"], params["content"])
-            elif tool_name == "list_files":
-                return self.tools.list_files(params.get("directory", "."))
-            elif tool_name == "execute_command":
-                return self.tools.execute_command(params["command"], params.get("cwd"))
-            elif tool_name == "search_files":
-                return self.tools.search_files(params["pattern"], params.get("file_pattern", "*"))
-            elif tool_name == "get_file_info":
-                return self.tools.get_file_info(params["path"])
-            elif tool_name == "create_branch":
-                return self.git_helper.create_feature_branch(
-                    self.agent.settings.role.value,
-                    params.get("task_id", "task"),
-                    params.get("task_title")
-                )
-            elif tool_name == "commit_changes":
-                return self.git_helper.commit_changes(
-                    params["title"],
-                    params["description"],
-                    self.agent.settings.role.value,
-                    params.get("task_id", "task")
-                )
-            elif tool_name == "push_branch":
-                return self.git_helper.push_branch(params["branch_name"])
-            else:
+            handler = self._dispatch.get(tool_name)
+            if handler is None:
                 raise ValueError(f"Unknown tool: {tool_name}")
+            # File, subprocess and git work blocks, so keep it off the event loop
+            return await asyncio.to_thread(handler, params)
         except Exception as e:
             return {"error": str(e)}
 
 
-# Create enhanced API
-app = FastAPI()
+# Create enhanced API; tool results such as search_files matches can be large,
+# so encode them with orjson instead of the stdlib json module
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 @app.post("/ask")
-async def ask_agent(request: Dict[str, Any]):
+async def ask_agent(request: AskRequest):
     """Process a message with tool support"""
-    message = request.get("message", "")
-    context = request.get("context", {})
-    
     # Get the tool-enabled agent from app state
     tool_agent = app.state.tool_agent
     
-    response = await tool_agent.process_with_tools(message)
+    response = await tool_agent.process_with_tools(request.message)
     
     return {"response": response}
 
@@ -133,20 +213,68 @@ async def execute_tool(tool_name: str, request: ToolRequest):
         return ToolResponse(success=False, result=None, error=str(e))
 
 
+@app.get("/tools/read_file_stream")
+async def read_file_stream(path: str):
+    """Stream a file from the workspace in fixed-size chunks"""
+    tool_agent = app.state.tool_agent
+    
+    try:
+        file_path = tool_agent.tools.resolve_path(path)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail=f"File not found: {path}")
+    
+    async def chunks():
+        async with aiofiles.open(file_path, "rb") as f:
+            while chunk := await f.read(STREAM_CHUNK_SIZE):
+                yield chunk
+    
+    return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+
+@app.put("/tools/write_file_stream")
+async def write_file_stream(path: str, request: Request):
+    """Write the request body to a file in the workspace as it arrives"""
+    tool_agent = app.state.tool_agent
+    
+    try:
+        file_path = tool_agent.tools.resolve_path(path)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    
+    # Write beside the target and swap it in, so a rejected or broken
+    # upload never leaves a truncated file behind
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = file_path.with_name(file_path.name + ".part")
+    written = 0
+    try:
+        async with aiofiles.open(part_path, "wb") as f:
+            async for chunk in request.stream():
+                written += len(chunk)
+                if written > tool_agent.max_file_size:
+                    raise HTTPException(status_code=413, detail="File exceeds max_file_size_mb")
+                await f.write(chunk)
+        os.replace(part_path, file_path)
+    finally:
+        part_path.unlink(missing_ok=True)
+    
+    return ToolResponse(success=True, result=f"File written: {file_path}")
+
+
 @app.get("/")
 async def root():
     """Health check"""
     return {"status": "running", "agent": app.state.agent_role, "tools": "enabled"}
 
 
-if __name__ == "__main__":
-    # Get configuration from environment
-    role = os.environ.get("AGENT_ROLE", "backend").lower()
+def build_app(role: str) -> FastAPI:
+    """Configure the app with a tool-enabled agent for the given role"""
+    from config.settings import settings
     
     # Load workspace configuration
     workspace_config_path = project_root / "config" / "agent_workspace.json"
-    with open(workspace_config_path) as f:
-        workspace_config = json.load(f)
+    workspace_config = load_json(workspace_config_path)
     
     agent_config = workspace_config.get("agents", {}).get(role, {})
     workspace_path = agent_config.get("working_directory", "/Users/maxim/dev/agent-workspace/devteam")
@@ -171,7 +299,28 @@ if __name__ == "__main__":
     # Store in app state
     app.state.tool_agent = tool_agent
     app.state.agent_role = role
+    return app
+
+
+def create_app() -> FastAPI:
+    """App factory for uvicorn; each worker process builds its own agent"""
+    return build_app(os.environ.get("AGENT_ROLE", "backend").lower())
+
+
+if __name__ == "__main__":
+    import uvicorn
+    from config.settings import settings
     
-    # Run the API
+    # Get configuration from environment
+    role = os.environ.get("AGENT_ROLE", "backend").lower()
+    
+    # Run the API. Each worker keeps its own conversation state, so only
+    # raise agent_workers for agents that serve stateless tool calls
     port = settings.get_agent_port(role)
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(
+        "agents.tool_agent:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=port,
+        workers=settings.agent_workers
+    )
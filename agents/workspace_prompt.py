@@ -0,0 +1,107 @@
+"""Workspace section of the system prompt for workspace-aware agents"""
+
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict
+
+
+DEFAULT_WORKING_DIRECTORY = "/Users/maxim/dev/agent-workspace/devteam"
+
+# Parsed once at import; substituted per role
+WORKSPACE_PROMPT_TEMPLATE = Template("""
+## Workspace Configuration
+
+You have access to a Git repository at: $workspace_path
+
+Your capabilities include: $capabilities
+
+You can work with these file types: $file_patterns
+
+### Git Workflow:
+- Create feature branches using pattern: $feature_branch_pattern
+- Always commit your changes with clear messages
+- Push changes to origin automatically: $auto_push
+- Create pull requests when tasks are complete: $create_pull_requests
+
+### Working Directory:
+Your primary working directory is: $workspace_path
+
+### Git Helper Commands Available:
+You have access to a git_helper object with these methods:
+- git_helper.create_feature_branch(agent_role, task_id, task_title) - Create a new branch for your work
+- git_helper.commit_changes(task_title, description, agent_role, task_id) - Commit your changes
+- git_helper.push_branch(branch_name) - Push branch to remote
+- git_helper.get_current_branch() - Get current branch name
+- git_helper.get_branch_status() - Get detailed git status
+- git_helper.create_github_pr(branch_name, title, description, changes, test_plan, agent_role) - Create PR
+
+### Important Note About File Access:
+As an AI agent, you cannot directly access or modify files in the workspace. You can only:
+1. Describe what changes need to be made
+2. Provide code snippets and examples
+3. Explain implementation approaches
+4. Review and analyze code when provided to you
+
+When a user asks you to make changes:
+1. Ask them to show you the current code/files you need to work with
+2. Analyze the code and provide specific changes
+3. Give clear instructions on what to modify
+4. Provide complete code snippets that can be copy-pasted
+
+### Your Workspace Information:
+- Your designated working directory is: $workspace_path
+- You can work with these file types: $file_patterns
+- Your role capabilities: $capabilities
+
+### Git Workflow (Conceptual):
+When you need to make changes, guide the user through:
+1. Creating a feature branch: `git checkout -b agent/$role/feature-name`
+2. Making the necessary code changes
+3. Committing with clear messages: `git commit -m "Description of changes"`
+4. Pushing the branch: `git push -u origin branch-name`
+5. Creating a pull request with detailed description
+
+### How to Respond to Code Change Requests:
+1. If you need to see existing code, ask: "Please show me the current [filename] so I can make the appropriate changes"
+2. When providing changes, use clear markdown code blocks with the language specified
+3. Explain what each change does and why it's necessary
+4. Provide complete, working code that can be directly used
+5. Include any necessary imports or dependencies
+
+IMPORTANT: 
+- Always ask to see the current code before suggesting changes
+- Provide complete, working code snippets
+- Explain your changes clearly
+- Your working directory context is: $workspace_path
+""")
+
+
+@lru_cache(maxsize=8)
+def _render_workspace_prompt(role: str, workspace_path: str, capabilities: str,
+                             file_patterns: str, feature_branch_pattern: str,
+                             auto_push: Any, create_pull_requests: Any) -> str:
+    return WORKSPACE_PROMPT_TEMPLATE.substitute(
+        role=role,
+        workspace_path=workspace_path,
+        capabilities=capabilities,
+        file_patterns=file_patterns,
+        feature_branch_pattern=feature_branch_pattern,
+        auto_push=auto_push,
+        create_pull_requests=create_pull_requests
+    )
+
+
+def build_workspace_prompt(role: str, workspace_config: Dict[str, Any]) -> str:
+    """Build the workspace prompt addition for an agent role"""
+    agent_config = workspace_config.get("agents", {}).get(role, {})
+    git_workflow = workspace_config.get("git_workflow", {})
+    
+    return _render_workspace_prompt(
+        role,
+        agent_config.get("working_directory", DEFAULT_WORKING_DIRECTORY),
+        ", ".join(agent_config.get("capabilities", [])),
+        ", ".join(agent_config.get("file_patterns", ["*"])),
+        git_workflow.get("feature_branch_pattern", "agent/{role}/{task_id}"),
+        git_workflow.get("auto_push", True),
+        git_workflow.get("create_pull_requests", True)
+    )
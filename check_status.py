@@ -1,43 +1,68 @@
 #!/usr/bin/env python3
 """Check status of all DevTeam services"""
 
-import requests
-import json
+import asyncio
+import aiohttp
+import orjson
 
-def check_service(name, url):
+SERVICES = {
+    "web_backend": ("Web Backend API", "http://localhost:8000/docs"),
+    "web_frontend": ("Web Frontend", "http://localhost:3000/"),
+    "tool_server": ("Tool Server", "http://localhost:8500/status"),
+}
+
+# Applied to the whole session, so every probe shares one timeout policy
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=2)
+
+async def check_service(session, name, url):
     try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            data = response.json() if response.headers.get('content-type') == 'application/json' else response.text
-            return f"✅ {name}: Running", data
-        else:
-            return f"⚠️  {name}: Status {response.status_code}", None
-    except requests.exceptions.ConnectionError:
+        async with session.get(url) as response:
+            if response.status == 200:
+                body = await response.read()
+                data = orjson.loads(body) if response.content_type == 'application/json' else body.decode(errors='replace')
+                return f"✅ {name}: Running", data
+            else:
+                return f"⚠️  {name}: Status {response.status}", None
+    except aiohttp.ClientConnectionError:
         return f"❌ {name}: Not running", None
     except Exception as e:
         return f"❌ {name}: Error - {e}", None
 
-print("🔍 DevTeam Status Check")
-print("=" * 50)
-
-# Check web services
-print("\n🌐 Web Services:")
-web_status, _ = check_service("Web Backend API", "http://localhost:8000/docs")
-print(f"  {web_status}")
-if "Running" in web_status:
-    print(f"     API Docs: http://localhost:8000/docs")
-
-frontend_status, _ = check_service("Web Frontend", "http://localhost:3000/")
-print(f"  {frontend_status}")
-if "Running" in frontend_status:
-    print(f"     Dashboard: http://localhost:3000")
-
-# Check tool server
-print("\n🔧 Tool Services:")
-tool_status, _ = check_service("Tool Server", "http://localhost:8500/status")
-print(f"  {tool_status}")
-
-print("\n💡 Tips:")
-print("  - Access the web dashboard at: http://localhost:3000")
-print("  - Projects and agents are managed through the web interface")
-print("  - Check logs in: ./logs/")
\ No newline at end of file
+async def check_all():
+    # Probe every service at once so down services cost one timeout in total
+    async with aiohttp.ClientSession(timeout=PROBE_TIMEOUT) as session:
+        results = await asyncio.gather(
+            *(check_service(session, name, url) for name, url in SERVICES.values())
+        )
+    return dict(zip(SERVICES, results))
+
+def main():
+    results = asyncio.run(check_all())
+
+    print("🔍 DevTeam Status Check")
+    print("=" * 50)
+
+    # Check web services
+    print("\n🌐 Web Services:")
+    web_status, _ = results["web_backend"]
+    print(f"  {web_status}")
+    if "Running" in web_status:
+        print(f"     API Docs: http://localhost:8000/docs")
+
+    frontend_status, _ = results["web_frontend"]
+    print(f"  {frontend_status}")
+    if "Running" in frontend_status:
+        print(f"     Dashboard: http://localhost:3000")
+
+    # Check tool server
+    print("\n🔧 Tool Services:")
+    tool_status, _ = results["tool_server"]
+    print(f"  {tool_status}")
+
+    print("\n💡 Tips:")
+    print("  - Access the web dashboard at: http://localhost:3000")
+    print("  - Projects and agents are managed through the web interface")
+    print("  - Check logs in: ./logs/")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 """Central configuration management for DevTeam"""
 
 import os
+from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -48,6 +49,7 @@ class Settings(BaseSettings):
     qa_port: int = Field(default=8304, description="QA agent port")
     ba_port: int = Field(default=8305, description="BA agent port")
     teamlead_port: int = Field(default=8306, description="Team lead agent port")
+    agent_workers: int = Field(default=1, description="Worker processes per agent server")
     
     # Web Dashboard
     web_backend_port: int = Field(default=8000, description="Web backend port")
@@ -73,11 +75,13 @@ class Settings(BaseSettings):
     mock_telegram: bool = Field(default=False, description="Mock Telegram API")
     mock_github: bool = Field(default=False, description="Mock GitHub API")
     
+    # Frozen so values derived from the fields, like the agent port map, can be cached
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
-        extra="ignore"
+        extra="ignore",
+        frozen=True
     )
     
     @property
@@ -94,9 +98,10 @@ class Settings(BaseSettings):
             return self.github_repo.split("/")[0]
         return None
     
-    def get_agent_port(self, role: str) -> int:
-        """Get port for specific agent role"""
-        port_map = {
+    @cached_property
+    def _agent_port_map(self) -> Dict[str, int]:
+        """Agent ports by role, built on first use"""
+        return {
             "backend": self.backend_port,
             "frontend": self.frontend_port,
             "database": self.database_port,
@@ -104,7 +109,10 @@ class Settings(BaseSettings):
             "ba": self.ba_port,
             "teamlead": self.teamlead_port,
         }
-        return port_map.get(role, 8300)
+    
+    def get_agent_port(self, role: str) -> int:
+        """Get port for specific agent role"""
+        return self._agent_port_map.get(role, 8300)
     
     def is_telegram_configured(self) -> bool:
         """Check if Telegram is properly configured"""
@@ -1,9 +1,9 @@
 """Agent configuration management"""
 
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel, Field
 from pathlib import Path
-import json
 
 
 class AgentPermissions(BaseModel):
@@ -117,22 +117,21 @@ class AgentConfiguration(BaseModel):
     
     @classmethod
     def load(cls, config_path: Path) -> Optional["AgentConfiguration"]:
-        """Load configuration from file"""
-        if not config_path.exists():
-            return None
+        """Load configuration from file, re-parsing it only when its mtime changes
         
+        The returned instance is shared between callers and must not be mutated.
+        """
         try:
-            with open(config_path) as f:
-                data = json.load(f)
-            return cls.model_validate(data)
-        except Exception:
+            mtime_ns = config_path.stat().st_mtime_ns
+        except OSError:
             return None
+        return _load_agent_configuration(str(config_path), mtime_ns)
     
     def save(self, config_path: Path) -> None:
         """Save configuration to file"""
         config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(config_path, 'w') as f:
-            json.dump(self.model_dump(), f, indent=2)
+        # Serialized straight from the model by pydantic-core, without an intermediate dict
+        config_path.write_text(self.model_dump_json(indent=2), encoding="utf-8")
     
     @classmethod
     def get_default_for_role(cls, agent_id: str, role: str) -> "AgentConfiguration":
@@ -183,4 +182,13 @@ class AgentConfiguration(BaseModel):
             ])
             config.permissions.can_modify_git_config = True
         
-        return config
\ No newline at end of file
+        return config
+
+
+@lru_cache(maxsize=128)
+def _load_agent_configuration(config_path: str, mtime_ns: int) -> Optional[AgentConfiguration]:
+    try:
+        # Parsed and validated in one pass by pydantic-core, without building a dict first
+        return AgentConfiguration.model_validate_json(Path(config_path).read_bytes())
+    except Exception:
+        return None
@@ -4,10 +4,15 @@ import subprocess
 import psutil
 import signal
 import os
-import json
+import orjson
+import fcntl
+import random
 import socket
+import time
+import httpx
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
@@ -17,6 +22,77 @@ from .project_config import ProjectConfig
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent agent /status requests in one poll
+STATUS_FETCH_WORKERS = 16
+
+# Seconds a project's agent status is reused, so bursts of dashboard polls cost one check
+STATUS_CACHE_TTL = 0.5
+
+# Seconds to wait for a local agent port to accept a connection before skipping its /status request
+PORT_ALIVE_TIMEOUT = 0.05
+
+# Seconds stopping agents may take to exit after SIGTERM before they are killed
+AGENT_STOP_TIMEOUT = 5
+
+# Kernel-assigned ports to try once the agent port range is exhausted
+EPHEMERAL_PORT_ATTEMPTS = 3
+
+# Scripts whose processes are agents started by AgentManager
+AGENT_SCRIPTS = ('run_project_agent.py', 'start_project_bridge.py')
+
+
+# Shared by every AgentManager of this user, so concurrent managers never hand out the same port
+PORT_LOCK_DIR = Path.home() / ".agent_ports"
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temp sibling and rename it into place, so a crash never leaves a partial file"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _is_agent_cmdline(cmdline: List[str]) -> bool:
+    """Check whether a process command line runs one of the agent scripts"""
+    return any(script in arg for arg in cmdline for script in AGENT_SCRIPTS)
+
+
+class PortLock:
+    """Exclusive, cross-process claim on a port via flock on a per-port lock file
+    
+    The lock belongs to the open file, so an agent process that inherits the
+    descriptor keeps the port claimed until it exits. While reserved, the lock
+    also holds the socket bound to the port, which is handed to the agent.
+    """
+    
+    def __init__(self, lock_dir: Path, port: int):
+        self.path = lock_dir / f"{port}.lock"
+        self.port = port
+        self.fd: Optional[int] = None
+        self.sock: Optional[socket.socket] = None
+    
+    def acquire(self) -> bool:
+        """Try to take the lock without blocking; returns False if another holder has it"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+    
+    def release(self) -> None:
+        """Close this process's handles on the lock and the bound socket"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
 
 class AgentManager:
     """Manages agent processes across all projects"""
@@ -29,6 +105,25 @@ class AgentManager:
         # Track port allocations
         self.port_file = app_config.home_directory / ".agent_ports.json"
         self.allocated_ports: Dict[str, Dict[str, int]] = {}  # project_id -> {agent_id -> port}
+        # All ports in allocated_ports, kept in step with it for O(1) lookups
+        self._used_ports: Set[int] = set()
+        # Shared client for agent /status requests, created on first use
+        self._status_client: Optional[httpx.Client] = None
+        # project_id -> (monotonic time collected, agent status)
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Dict[str, any]]]] = {}
+        # Port locks held between allocating a port and starting its agent
+        self.port_lock_dir = PORT_LOCK_DIR
+        self._port_locks: Dict[int, PortLock] = {}
+        # Resolved once here rather than for every process started
+        self._devteam_dir = Path(__file__).resolve().parent.parent
+        venv_python = self._devteam_dir / '.venv' / 'bin' / 'python'
+        # Use the poetry environment Python when there is one
+        self._python_path = str(venv_python) if venv_python.exists() else 'python'
+        self._logs_dir = app_config.home_directory / "logs"
+        self._logs_dir_ready = False
+        # Set when the PID or port state changes, and cleared once it is saved
+        self._pids_dirty = False
+        self._ports_dirty = False
         self._load_pid_file()
         self._load_port_file()
     
@@ -36,12 +131,14 @@ class AgentManager:
         """Load running agent PIDs from file"""
         if self.pid_file.exists():
             try:
-                with open(self.pid_file, 'r') as f:
-                    pid_data = json.load(f)
-                # Verify PIDs are still running
+                with open(self.pid_file, 'rb') as f:
+                    pid_data = orjson.loads(f.read())
+                # Verify PIDs are still running. Only liveness is checked here;
+                # whether a PID is still one of our agents is checked when its
+                # status is read or before it is stopped
                 for project_id, agents in pid_data.items():
                     for agent_id, pid in agents.items():
-                        if self._is_process_running(pid):
+                        if self._pid_alive(pid):
                             # Process still exists, track it
                             if project_id not in self.running_processes:
                                 self.running_processes[project_id] = {}
@@ -54,11 +151,14 @@ class AgentManager:
         """Load allocated ports from file"""
         if self.port_file.exists():
             try:
-                with open(self.port_file, 'r') as f:
-                    self.allocated_ports = json.load(f)
+                with open(self.port_file, 'rb') as f:
+                    self.allocated_ports = orjson.loads(f.read())
             except Exception as e:
                 logger.error(f"Failed to load port file: {e}")
                 self.allocated_ports = {}
+            self._used_ports = {
+                port for project_ports in self.allocated_ports.values() for port in project_ports.values()
+            }
     
     def _save_pid_file(self):
         """Save running agent PIDs to file"""
@@ -72,19 +172,44 @@ class AgentManager:
                     pid_data[project_id][agent_id] = process.pid
         
         try:
-            with open(self.pid_file, 'w') as f:
-                json.dump(pid_data, f)
+            _write_json_atomic(self.pid_file, pid_data)
+            self._pids_dirty = False
         except Exception as e:
             logger.error(f"Failed to save PID file: {e}")
     
     def _save_port_file(self):
         """Save allocated ports to file"""
         try:
-            with open(self.port_file, 'w') as f:
-                json.dump(self.allocated_ports, f)
+            _write_json_atomic(self.port_file, self.allocated_ports)
+            self._ports_dirty = False
         except Exception as e:
             logger.error(f"Failed to save port file: {e}")
     
+    def _log_file(self, name: str) -> Path:
+        """Get the path of a process log file, creating the logs directory on first use"""
+        if not self._logs_dir_ready:
+            self._logs_dir.mkdir(exist_ok=True)
+            self._logs_dir_ready = True
+        return self._logs_dir / f"{name}.log"
+    
+    def _flush_state(self):
+        """Save the PID and port files that changed since they were last saved"""
+        if self._pids_dirty:
+            self._save_pid_file()
+        if self._ports_dirty:
+            self._save_port_file()
+    
+    def _pid_alive(self, pid: int) -> bool:
+        """Check whether a PID exists with a single signal-0 syscall"""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Exists but belongs to another user
+            return True
+        return True
+    
     def _is_process_running(self, pid: int) -> bool:
         """Check if a process is still running"""
         try:
@@ -94,8 +219,7 @@ class AgentManager:
                 # Additional check to ensure it's one of our agent processes
                 try:
                     cmdline = process.cmdline()
-                    is_agent = any('run_project_agent.py' in arg or 'start_project_bridge.py' in arg 
-                                  for arg in cmdline)
+                    is_agent = _is_agent_cmdline(cmdline)
                     if not is_agent:
                         logger.debug(f"Process {pid} is running but not an agent: {cmdline}")
                     return is_agent
@@ -107,30 +231,88 @@ class AgentManager:
         except psutil.NoSuchProcess:
             return False
     
-    def _find_available_port(self, start_port: int = 8301, end_port: int = 8399) -> int:
-        """Find an available port in the specified range"""
+    def _get_status_client(self) -> httpx.Client:
+        """Get the HTTP client used to fetch agent status, reusing its connection pool"""
+        if self._status_client is None or self._status_client.is_closed:
+            self._status_client = httpx.Client(
+                timeout=2.0,
+                limits=httpx.Limits(max_keepalive_connections=64)
+            )
+        return self._status_client
+    
+    def _snapshot_agent_pids(self) -> Dict[int, Optional[List[str]]]:
+        """Scan the process table once and map PIDs of running agents to their cmdline"""
+        snapshot = {}
+        for process in psutil.process_iter(['pid', 'cmdline']):
+            cmdline = process.info['cmdline']
+            # As in _is_process_running, a cmdline we can't read counts as an agent
+            if cmdline is None or _is_agent_cmdline(cmdline):
+                snapshot[process.info['pid']] = cmdline
+        return snapshot
+    
+    def _reserve_port(self, port: int) -> bool:
+        """Lock and bind a port; the lock is kept in _port_locks until the agent starts"""
+        if port in self._port_locks:
+            return False
         
-        # Collect all currently allocated ports
-        used_ports = set()
-        for project_ports in self.allocated_ports.values():
-            used_ports.update(project_ports.values())
+        port_lock = PortLock(self.port_lock_dir, port)
+        if not port_lock.acquire():
+            # Claimed by another agent or manager
+            return False
         
-        # Try to find an available port
-        for port in range(start_port, end_port + 1):
-            if port in used_ports:
-                continue
-                
-            # Check if port is actually available
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('', port))
-                    return port
-            except OSError:
-                # Port is in use
+        # Bind the port now and keep it bound, so it stays ours until the agent serves on it
+        port_lock.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            # Same socket options uvicorn would use when binding the port itself
+            port_lock.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            port_lock.sock.bind(('', port))
+        except OSError:
+            # Port is in use
+            port_lock.release()
+            return False
+        
+        self._port_locks[port] = port_lock
+        return True
+    
+    def _find_available_port(self, start_port: int = 8301, end_port: int = 8399) -> int:
+        """Find an available port in the specified range and reserve it
+        
+        Falls back to a kernel-assigned port when the whole range is taken.
+        """
+        # Probe in random order so concurrent managers rarely race for the same
+        # port and a busy low end of the range isn't rescanned on every call
+        candidates = range(start_port, end_port + 1)
+        for port in random.sample(candidates, len(candidates)):
+            if port in self._used_ports:
                 continue
+            
+            if self._reserve_port(port):
+                return port
+        
+        for _ in range(EPHEMERAL_PORT_ATTEMPTS):
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.bind(('', 0))
+                port = s.getsockname()[1]
+            if port not in self._used_ports and self._reserve_port(port):
+                logger.warning(f"No available ports in range {start_port}-{end_port}, using port {port}")
+                return port
         
         raise RuntimeError(f"No available ports in range {start_port}-{end_port}")
     
+    def _allocate_port(self, project_id: str, agent_id: str) -> PortLock:
+        """Reserve a port for an agent, reusing its previous port when that is still free"""
+        project_ports = self.allocated_ports.setdefault(project_id, {})
+        port = project_ports.get(agent_id)
+        if port is None or not self._reserve_port(port):
+            # Drop the old port only once a new one is reserved, so a failed
+            # search leaves the used ports matching allocated_ports
+            new_port = self._find_available_port()
+            self._used_ports.discard(port)
+            port = project_ports[agent_id] = new_port
+            self._used_ports.add(port)
+            self._ports_dirty = True
+        return self._port_locks.pop(port)
+    
     def start_project_agents(self, project_id: str) -> Dict[str, str]:
         """Start all agents for a project"""
         results = {}
@@ -144,65 +326,60 @@ class AgentManager:
         project_config = ProjectConfig.load(project_path)
         
         # Stop any existing agents for this project
-        self.stop_project_agents(project_id)
+        self._stop_project_agents(project_id)
         
         # Create project process tracking
         self.running_processes[project_id] = {}
+        self._pids_dirty = True
+        
+        # Environment shared by every agent of the project, copied from os.environ once
+        base_env = os.environ.copy()
+        base_env['DEVTEAM_PROJECT_ID'] = project_id
+        base_env['DEVTEAM_HOME'] = str(self.app_config.home_directory)
+        
+        # Pass API key if available
+        if self.app_config.tokens.anthropic_api_key:
+            base_env['ANTHROPIC_API_KEY'] = self.app_config.tokens.anthropic_api_key
         
         # Start each active agent
         for agent_id, agent_info in project_config.active_agents.items():
             try:
-                # Prepare environment
-                env = os.environ.copy()
-                env['DEVTEAM_PROJECT_ID'] = project_id
-                env['DEVTEAM_AGENT_ID'] = agent_id
-                env['DEVTEAM_AGENT_ROLE'] = agent_info.role
-                env['DEVTEAM_AGENT_NAME'] = agent_info.name
-                env['DEVTEAM_HOME'] = str(self.app_config.home_directory)
-                
-                # Pass API key if available
-                if self.app_config.tokens.anthropic_api_key:
-                    env['ANTHROPIC_API_KEY'] = self.app_config.tokens.anthropic_api_key
-                
                 # Allocate port dynamically
-                if project_id not in self.allocated_ports:
-                    self.allocated_ports[project_id] = {}
-                
-                # Try to reuse previously allocated port or get a new one
-                if agent_id in self.allocated_ports[project_id]:
-                    port = self.allocated_ports[project_id][agent_id]
-                    # Verify it's still available
-                    try:
-                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                            s.bind(('', port))
-                    except OSError:
-                        # Port is taken, allocate a new one
-                        port = self._find_available_port()
-                        self.allocated_ports[project_id][agent_id] = port
-                else:
-                    port = self._find_available_port()
-                    self.allocated_ports[project_id][agent_id] = port
+                port_lock = self._allocate_port(project_id, agent_id)
+                port = port_lock.port
                 
-                env['AGENT_PORT'] = str(port)
+                # Prepare environment
+                env = base_env | {
+                    'DEVTEAM_AGENT_ID': agent_id,
+                    'DEVTEAM_AGENT_ROLE': agent_info.role,
+                    'DEVTEAM_AGENT_NAME': agent_info.name,
+                    'AGENT_PORT': str(port),
+                }
                 
                 # Start agent process
-                log_file = self.app_config.home_directory / "logs" / f"{project_id}_{agent_id}.log"
-                log_file.parent.mkdir(exist_ok=True)
+                log_file = self._log_file(f"{project_id}_{agent_id}")
                 
-                with open(log_file, 'w') as log:
-                    # Get the devteam directory (where this script is located)
-                    devteam_dir = Path(__file__).parent.parent
-                    # Use the poetry environment Python
-                    python_path = devteam_dir / '.venv' / 'bin' / 'python'
-                    if not python_path.exists():
-                        python_path = 'python'
-                    process = subprocess.Popen(
-                        [str(python_path), 'agents/run_project_agent.py'],
-                        env=env,
-                        stdout=log,
-                        stderr=subprocess.STDOUT,
-                        cwd=str(devteam_dir)
-                    )
+                try:
+                    # The agent serves on the socket bound here instead of binding
+                    # the port itself, so there is no window for another process
+                    port_lock.sock.listen(128)
+                    env['AGENT_LISTEN_FD'] = str(port_lock.sock.fileno())
+                    
+                    with open(log_file, 'wb', buffering=0) as log:
+                        # The agent inherits the port lock and holds it until it exits.
+                        # pass_fds and cwd rule out posix_spawn, but without preexec_fn
+                        # or user/group switching CPython still starts the child with
+                        # vfork on Linux instead of copying this process; keep it that way
+                        process = subprocess.Popen(
+                            [self._python_path, 'agents/run_project_agent.py'],
+                            env=env,
+                            stdout=log,
+                            stderr=subprocess.STDOUT,
+                            cwd=str(self._devteam_dir),
+                            pass_fds=(port_lock.fd, port_lock.sock.fileno())
+                        )
+                finally:
+                    port_lock.release()
                 
                 self.running_processes[project_id][agent_id] = process
                 results[agent_id] = "started"
@@ -221,65 +398,158 @@ class AgentManager:
                 logger.error(f"Failed to start Telegram bridge: {e}")
                 results["telegram_bridge"] = f"failed: {str(e)}"
         
-        self._save_pid_file()
-        self._save_port_file()
+        self._status_cache.pop(project_id, None)
+        self._flush_state()
         return results
     
     def stop_project_agents(self, project_id: str) -> Dict[str, str]:
         """Stop all agents for a project"""
+        results = self._stop_project_agents(project_id)
+        self._flush_state()
+        return results
+    
+    def _stop_project_agents(self, project_id: str) -> Dict[str, str]:
+        """Stop all agents for a project without saving the PID and port files"""
         results = {}
+        self._status_cache.pop(project_id, None)
         
         if project_id not in self.running_processes:
             return {"status": "no agents running"}
         
+        # Signal every agent first, then wait for them together, so hung agents
+        # cost one timeout in total instead of one each
+        procs = []
+        popens = []
         for agent_id, process in self.running_processes[project_id].items():
             try:
                 if isinstance(process, int):
-                    # Just have PID, use psutil
-                    try:
+                    # Just have PID, use psutil. Make sure the PID still belongs
+                    # to an agent so a reused PID is never signalled
+                    if self._is_process_running(process):
                         p = psutil.Process(process)
                         p.terminate()
-                        p.wait(timeout=5)
-                    except psutil.TimeoutExpired:
-                        p.kill()
-                    except psutil.NoSuchProcess:
-                        pass
+                        procs.append(p)
                 elif hasattr(process, 'terminate'):
                     # It's a Popen-like object
                     process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                        process.wait()
+                    popens.append(process)
+                    procs.append(psutil.Process(process.pid))
                 
                 results[agent_id] = "stopped"
                 logger.info(f"Stopped agent {agent_id} for project {project_id}")
                 
+            except psutil.NoSuchProcess:
+                # Already exited
+                results[agent_id] = "stopped"
             except Exception as e:
                 logger.error(f"Failed to stop agent {agent_id}: {e}")
                 results[agent_id] = f"failed: {str(e)}"
         
+        _, alive = psutil.wait_procs(procs, timeout=AGENT_STOP_TIMEOUT)
+        for p in alive:
+            try:
+                p.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(alive, timeout=2)
+        # psutil has reaped the children; let their Popen objects notice
+        for process in popens:
+            process.poll()
+        
         # Clean up tracking
         del self.running_processes[project_id]
+        self._pids_dirty = True
         if project_id in self.allocated_ports:
-            del self.allocated_ports[project_id]
-        self._save_pid_file()
-        self._save_port_file()
+            self._used_ports.difference_update(self.allocated_ports.pop(project_id).values())
+            self._ports_dirty = True
         
         return results
     
-    def get_project_status(self, project_id: str) -> Dict[str, Dict[str, any]]:
-        """Get status of all agents in a project"""
+    def get_project_status(self, project_id: str,
+                           snapshot: Optional[Dict[int, Optional[List[str]]]] = None) -> Dict[str, Dict[str, any]]:
+        """Get status of all agents in a project
+        
+        Agents tracked only by PID are checked against snapshot when given,
+        otherwise each PID is looked up on its own. Status collected within
+        the last STATUS_CACHE_TTL seconds is returned as is.
+        """
+        cached = self._cached_status(project_id)
+        if cached is not None:
+            return cached
+        
+        status, targets = self._collect_project_status(project_id, snapshot)
+        self._fetch_agent_info(targets)
+        self._status_cache[project_id] = (time.monotonic(), status)
+        return status
+    
+    def get_all_projects_status(self) -> Dict[str, Dict[str, any]]:
+        """Get status of all projects and their agents"""
+        all_status = {}
+        for project_id, project_status in self._collect_status_batch().items():
+            all_status[project_id] = {
+                "agents": project_status,
+                "total_agents": len(project_status),
+                "running_agents": sum(1 for a in project_status.values() 
+                                    if isinstance(a, dict) and a.get("running", False))
+            }
+        
+        return all_status
+    
+    def _collect_status_batch(self) -> Dict[str, Dict[str, Dict[str, any]]]:
+        """Get agent status of every project with one process scan and one status fan-out"""
+        project_statuses = {}
+        for project_id in self.app_config.projects:
+            cached = self._cached_status(project_id)
+            if cached is None:
+                break
+            project_statuses[project_id] = cached
+        else:
+            return project_statuses
+        
+        project_statuses = {}
+        targets = []
+        # Agents recovered from the PID file are only known by PID; check them
+        # all against one process table scan instead of one lookup per PID
+        snapshot = None
+        if any(isinstance(process, int)
+               for agents in self.running_processes.values() for process in agents.values()):
+            snapshot = self._snapshot_agent_pids()
+        
+        for project_id in self.app_config.projects:
+            project_statuses[project_id], project_targets = self._collect_project_status(project_id, snapshot)
+            targets.extend(project_targets)
+        
+        # Query running agents of every project in a single fan-out
+        self._fetch_agent_info(targets)
+        
+        collected = time.monotonic()
+        for project_id, status in project_statuses.items():
+            self._status_cache[project_id] = (collected, status)
+        return project_statuses
+    
+    def _cached_status(self, project_id: str) -> Optional[Dict[str, Dict[str, any]]]:
+        """Get a project's agent status if it was collected within the cache TTL"""
+        collected, status = self._status_cache.get(project_id, (0.0, None))
+        if time.monotonic() - collected < STATUS_CACHE_TTL:
+            return status
+        return None
+    
+    def _collect_project_status(self, project_id: str,
+                                snapshot: Optional[Dict[int, Optional[List[str]]]] = None) -> Tuple[Dict[str, Dict[str, any]], List[Tuple[Dict[str, any], str, int]]]:
+        """Get process status of a project's agents and the running agents to query for more info"""
         status = {}
+        targets = []
         
         if project_id not in self.running_processes:
-            return {"status": "no agents running"}
+            return {"status": "no agents running"}, targets
         
         for agent_id, process in self.running_processes[project_id].items():
             try:
                 if isinstance(process, int):
-                    is_running = self._is_process_running(process)
+                    if snapshot is not None:
+                        is_running = process in snapshot
+                    else:
+                        is_running = self._is_process_running(process)
                     pid = process
                     logger.debug(f"Agent {agent_id}: PID {pid}, running: {is_running}")
                 elif hasattr(process, 'poll'):
@@ -298,34 +568,14 @@ class AgentManager:
                     "pid": pid
                 }
                 
-                # If agent is running, try to fetch additional info from its API
+                # If agent is running, fetch additional info from its API later
                 if is_running:
-                    try:
-                        # Get allocated port for this agent
-                        port = None
-                        if project_id in self.allocated_ports and agent_id in self.allocated_ports[project_id]:
-                            port = self.allocated_ports[project_id][agent_id]
-                        if port:
-                            # Try to fetch status from agent
-                            import httpx
-                            with httpx.Client(timeout=2.0) as client:
-                                agent_url = f"http://localhost:{port}/status"
-                                logger.info(f"Fetching status from agent {agent_id} at {agent_url}")
-                                response = client.get(agent_url)
-                                if response.status_code == 200:
-                                    agent_data = response.json()
-                                    logger.info(f"Agent {agent_id} status data: {agent_data}")
-                                    # Add branch info if available
-                                    if "branch" in agent_data:
-                                        agent_status["branch"] = agent_data["branch"]
-                                    if "has_changes" in agent_data:
-                                        agent_status["has_changes"] = agent_data["has_changes"]
-                                else:
-                                    logger.warning(f"Agent {agent_id} returned status {response.status_code}")
-                        else:
-                            logger.debug(f"No port mapping for agent {agent_id}")
-                    except Exception as e:
-                        logger.debug(f"Could not fetch additional info from agent {agent_id}: {e}")
+                    # Get allocated port for this agent
+                    port = self.allocated_ports.get(project_id, {}).get(agent_id)
+                    if port:
+                        targets.append((agent_status, agent_id, port))
+                    else:
+                        logger.debug(f"No port mapping for agent {agent_id}")
                 
                 status[agent_id] = agent_status
             except Exception as e:
@@ -335,27 +585,59 @@ class AgentManager:
                     "error": str(e)
                 }
         
-        return status
+        return status, targets
     
-    def get_all_projects_status(self) -> Dict[str, Dict[str, any]]:
-        """Get status of all projects and their agents"""
-        all_status = {}
+    def _fetch_agent_info(self, targets: List[Tuple[Dict[str, any], str, int]]) -> None:
+        """Fetch /status from running agents concurrently and merge it into their status"""
+        if len(targets) <= 1:
+            for target in targets:
+                self._fetch_agent_status(*target)
+            return
         
-        for project_id in self.app_config.projects:
-            project_status = self.get_project_status(project_id)
-            all_status[project_id] = {
-                "agents": project_status,
-                "total_agents": len(project_status),
-                "running_agents": sum(1 for a in project_status.values() 
-                                    if isinstance(a, dict) and a.get("running", False))
-            }
+        # Requests overlap, so a poll takes as long as the slowest agent rather than the sum
+        with ThreadPoolExecutor(max_workers=min(len(targets), STATUS_FETCH_WORKERS)) as executor:
+            for _ in executor.map(lambda target: self._fetch_agent_status(*target), targets):
+                pass
+    
+    def _fetch_agent_status(self, agent_status: Dict[str, any], agent_id: str, port: int) -> None:
+        """Add branch info from an agent's status endpoint to its status"""
+        # A refused connection is much cheaper than waiting out the HTTP timeout
+        if not self._port_alive(port):
+            logger.debug(f"Agent {agent_id} is not listening on port {port}")
+            return
         
-        return all_status
+        try:
+            # Try to fetch status from agent
+            agent_url = f"http://localhost:{port}/status"
+            logger.info(f"Fetching status from agent {agent_id} at {agent_url}")
+            response = self._get_status_client().get(agent_url)
+            if response.status_code == 200:
+                agent_data = response.json()
+                logger.info(f"Agent {agent_id} status data: {agent_data}")
+                # Add branch info if available
+                if "branch" in agent_data:
+                    agent_status["branch"] = agent_data["branch"]
+                if "has_changes" in agent_data:
+                    agent_status["has_changes"] = agent_data["has_changes"]
+            else:
+                logger.warning(f"Agent {agent_id} returned status {response.status_code}")
+        except Exception as e:
+            logger.debug(f"Could not fetch additional info from agent {agent_id}: {e}")
+    
+    def _port_alive(self, port: int) -> bool:
+        """Check whether anything accepts connections on a local port"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(PORT_ALIVE_TIMEOUT)
+            return s.connect_ex(('127.0.0.1', port)) == 0
     
     def stop_all_agents(self):
         """Stop all agents across all projects"""
         for project_id in list(self.running_processes.keys()):
             self.stop_project_agents(project_id)
+        
+        if self._status_client is not None:
+            self._status_client.close()
+            self._status_client = None
     
     
     def _start_telegram_bridge(self, project_id: str, project_config: ProjectConfig):
@@ -368,22 +650,15 @@ class AgentManager:
         if project_config.telegram_config.group_id:
             env['TELEGRAM_GROUP_ID'] = project_config.telegram_config.group_id
         
-        log_file = self.app_config.home_directory / "logs" / f"{project_id}_telegram.log"
-        log_file.parent.mkdir(exist_ok=True)
+        log_file = self._log_file(f"{project_id}_telegram")
         
-        with open(log_file, 'w') as log:
-            # Get the devteam directory
-            devteam_dir = Path(__file__).parent.parent
-            # Use the poetry environment Python
-            python_path = devteam_dir / '.venv' / 'bin' / 'python'
-            if not python_path.exists():
-                python_path = 'python'
+        with open(log_file, 'wb', buffering=0) as log:
             process = subprocess.Popen(
-                [str(python_path), 'telegram_bridge/start_project_bridge.py'],
+                [self._python_path, 'telegram_bridge/start_project_bridge.py'],
                 env=env,
                 stdout=log,
                 stderr=subprocess.STDOUT,
-                cwd=str(devteam_dir)
+                cwd=str(self._devteam_dir)
             )
         
         # Track as special "telegram" agent
@@ -2,12 +2,117 @@
 """Tools for agents to interact with the file system and execute commands"""
 
 import os
+import selectors
+import signal
+import shutil
+import stat
 import subprocess
+import threading
+import time
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 
+# Default safe commands, used when no allowed_commands are configured
+DEFAULT_ALLOWED_COMMANDS = frozenset([
+    'git', 'ls', 'cat', 'grep', 'find', 'npm', 'yarn', 'python', 'node', 
+    'mkdir', 'touch', 'rm', 'cp', 'mv',
+    # Test-related commands
+    'pytest', 'python -m pytest', 'poetry', 'pip',
+    'jest', 'mocha', 'vitest',  # JS test runners
+    'go', 'cargo',  # For Go and Rust tests
+    'make', 'bash', 'sh',  # For running test scripts
+    'coverage', 'nyc',  # Coverage tools
+    'tox', 'nox',  # Python test automation
+    'phpunit', 'rspec',  # PHP and Ruby tests
+    'dotnet', 'mvn', 'gradle'  # .NET, Java build tools
+])
+
+# Maximum number of matches returned by search_files
+SEARCH_RESULT_LIMIT = 20
+
+# Directories the grep fallback never descends into; rg skips them via .gitignore and hidden-dir rules
+SEARCH_SKIP_DIRS = ('.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build', 'target')
+
+# Seconds before a search is killed
+SEARCH_TIMEOUT = 10
+
+# Seconds before a command is killed
+COMMAND_TIMEOUT = 30
+
+# Bytes of stdout and of stderr kept from a command; the rest is read and discarded
+COMMAND_OUTPUT_LIMIT = 1024 * 1024
+
+
+def _read_command_output(process: subprocess.Popen, timeout: float) -> Optional[Tuple[str, str]]:
+    """Read a process's stdout and stderr as they are written, until it exits
+    
+    Keeps at most COMMAND_OUTPUT_LIMIT bytes of each stream. Returns None if
+    the process hasn't finished when the timeout expires.
+    """
+    deadline = time.monotonic() + timeout
+    buffers = {process.stdout: bytearray(), process.stderr: bytearray()}
+    sizes = {process.stdout: 0, process.stderr: 0}
+    
+    with selectors.DefaultSelector() as selector:
+        for stream in buffers:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, 64 * 1024)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                buffer = buffers[key.fileobj]
+                sizes[key.fileobj] += len(chunk)
+                # Keep draining past the limit so the command never blocks on a full pipe
+                if len(buffer) < COMMAND_OUTPUT_LIMIT:
+                    buffer += chunk[:COMMAND_OUTPUT_LIMIT - len(buffer)]
+    
+    try:
+        process.wait(max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        return None
+    
+    outputs = []
+    for stream, buffer in buffers.items():
+        output = buffer.decode(errors='replace')
+        if sizes[stream] > len(buffer):
+            output += f"\n... [output truncated, {sizes[stream]} bytes in total]"
+        outputs.append(output)
+    return outputs[0], outputs[1]
+
+
+def _parse_grep_line(line: bytes) -> Optional[Dict[str, str]]:
+    """Parse a `grep -Z` output line, where a NUL byte ends the file name"""
+    file_path, separator, content = line.partition(b'\0')
+    if not separator:
+        return None
+    return {
+        "file": file_path.decode(errors='replace').removeprefix('./'),
+        "line": content.decode(errors='replace').strip()
+    }
+
+
+def _parse_rg_line(line: bytes) -> Optional[Dict[str, str]]:
+    """Parse a `rg --json` output line, keeping only match events"""
+    event = json.loads(line)
+    if event.get("type") != "match":
+        return None
+    data = event["data"]
+    if "text" not in data["path"] or "text" not in data["lines"]:
+        # Paths or lines that aren't valid UTF-8 come base64-encoded; skip them
+        return None
+    return {
+        "file": data["path"]["text"].removeprefix('./'),
+        "line": data["lines"]["text"].strip()
+    }
+
+
 class AgentTools:
     """File system and command execution tools for agents"""
     
@@ -15,6 +120,20 @@ class AgentTools:
         self.workspace_path = Path(workspace_path)
         self.allowed_paths = allowed_paths or []
         self.allowed_commands = allowed_commands or []
+        self._rg_path = shutil.which('rg')
+        # Hashed once so each execute_command permission check is a set lookup
+        self._allowed_command_set = (
+            frozenset(self.allowed_commands) if self.allowed_commands else DEFAULT_ALLOWED_COMMANDS
+        )
+        # Resolved once, so validating a path only resolves the path itself
+        self._resolved_workspace = self.workspace_path.resolve()
+        self._resolved_allowed = []
+        for allowed_path in self.allowed_paths:
+            try:
+                self._resolved_allowed.append(Path(allowed_path).resolve())
+            except Exception:
+                # Skip invalid allowed paths
+                continue
         
     def _validate_path(self, path: str) -> Path:
         """Validate that path is within allowed workspace"""
@@ -36,32 +155,14 @@ class AgentTools:
                 except Exception as e:
                     raise ValueError(f"Invalid path: {path} - {str(e)}")
             
-        # Resolve workspace for comparison
-        try:
-            resolved_workspace = self.workspace_path.resolve()
-        except Exception as e:
-            raise ValueError(f"Invalid workspace path: {self.workspace_path} - {str(e)}")
-            
         # Check if the resolved path is within the workspace
-        try:
-            resolved_path.relative_to(resolved_workspace)
+        if resolved_path.is_relative_to(self._resolved_workspace):
             return resolved_path
-        except ValueError:
-            # Not in workspace, check allowed paths
-            pass
             
         # Check if path is in allowed paths
-        for allowed_path in self.allowed_paths:
-            try:
-                allowed_resolved = Path(allowed_path).resolve()
-                # Check if resolved_path is within this allowed path
-                resolved_path.relative_to(allowed_resolved)
+        for allowed_resolved in self._resolved_allowed:
+            if resolved_path.is_relative_to(allowed_resolved):
                 return resolved_path
-            except ValueError:
-                continue
-            except Exception:
-                # Skip invalid allowed paths
-                continue
         
         # Special case: if the path itself is in allowed_paths
         if str(resolved_path) in self.allowed_paths:
@@ -69,55 +170,62 @@ class AgentTools:
             
         raise ValueError(f"Path {path} is outside workspace and not in allowed paths. Agent can access: {self.workspace_path} and {self.allowed_paths}")
     
-    def read_file(self, file_path: str) -> str:
-        """Read a file from the workspace"""
+    def resolve_path(self, path: str) -> Path:
+        """Resolve a path the agent may access, raising ValueError otherwise"""
+        return self._validate_path(path)
+    
+    def read_bytes(self, file_path: str) -> bytes:
+        """Read a file from the workspace without decoding it"""
         path = self._validate_path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
-        return path.read_text()
+        return path.read_bytes()
     
-    def write_file(self, file_path: str, content: str) -> str:
-        """Write content to a file in the workspace"""
+    def read_file(self, file_path: str, encoding: str = "utf-8") -> str:
+        """Read a file from the workspace as text, replacing undecodable bytes"""
+        return self.read_bytes(file_path).decode(encoding, errors="replace")
+    
+    def write_bytes(self, file_path: str, data: bytes) -> str:
+        """Write raw bytes to a file in the workspace"""
         path = self._validate_path(file_path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        path.write_bytes(data)
         return f"File written: {path}"
     
+    def write_file(self, file_path: str, content: str, encoding: str = "utf-8") -> str:
+        """Write content to a file in the workspace"""
+        return self.write_bytes(file_path, content.encode(encoding))
+    
     def list_files(self, directory: str = ".") -> List[str]:
         """List files in a directory"""
         path = self._validate_path(directory)
-        if not path.is_dir():
+        
+        # Build entry paths from one relative prefix; scandir's entries know their
+        # type from the directory listing, so no stat call is needed per entry
+        relative_dir = path.relative_to(self._resolved_workspace)
+        prefix = "" if relative_dir == Path(".") else str(relative_dir) + os.sep
+        
+        # Let scandir reject files and missing paths instead of checking with a stat first
+        try:
+            entries = os.scandir(path)
+        except (NotADirectoryError, FileNotFoundError):
             raise ValueError(f"Not a directory: {path}")
         
         files = []
-        for item in path.iterdir():
-            if item.is_file():
-                files.append(str(item.relative_to(self.workspace_path)))
-            elif item.is_dir() and not item.name.startswith('.'):
-                files.append(str(item.relative_to(self.workspace_path)) + "/")
+        with entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append(prefix + entry.name)
+                elif entry.is_dir() and not entry.name.startswith('.'):
+                    files.append(prefix + entry.name + "/")
         
-        return sorted(files)
+        files.sort()
+        return files
     
     def execute_command(self, command: str, cwd: str = None) -> Dict[str, Any]:
         """Execute a shell command in the workspace"""
-        # Use instance allowed commands or default safe commands
-        if self.allowed_commands:
-            allowed_commands = self.allowed_commands
-        else:
-            allowed_commands = [
-                'git', 'ls', 'cat', 'grep', 'find', 'npm', 'yarn', 'python', 'node', 
-                'mkdir', 'touch', 'rm', 'cp', 'mv',
-                # Test-related commands
-                'pytest', 'python -m pytest', 'poetry', 'pip',
-                'jest', 'mocha', 'vitest',  # JS test runners
-                'go', 'cargo',  # For Go and Rust tests
-                'make', 'bash', 'sh',  # For running test scripts
-                'coverage', 'nyc',  # Coverage tools
-                'tox', 'nox',  # Python test automation
-                'phpunit', 'rspec',  # PHP and Ruby tests
-                'dotnet', 'mvn', 'gradle'  # .NET, Java build tools
-            ]
-        cmd_parts = command.split()
+        # Only the first three words decide whether a command is allowed
+        cmd_parts = command.split(None, 3)
         if not cmd_parts:
             raise ValueError("Empty command")
             
@@ -129,13 +237,7 @@ class AgentTools:
             cmd_start = "python -m " + cmd_parts[2]
         
         # Check if command is allowed
-        is_allowed = False
-        for allowed in allowed_commands:
-            if cmd_start == allowed or (allowed in ['python', 'node', 'poetry', 'pip', 'npm', 'yarn'] and cmd_start == allowed):
-                is_allowed = True
-                break
-                
-        if not is_allowed:
+        if cmd_start not in self._allowed_command_set:
             raise ValueError(f"Command not allowed: {cmd_start}")
         
         working_dir = self.workspace_path
@@ -143,25 +245,41 @@ class AgentTools:
             working_dir = self._validate_path(cwd)
             
         try:
-            result = subprocess.run(
+            # In its own process group, so a timeout can kill everything the
+            # shell started and not just the shell
+            process = subprocess.Popen(
                 command,
                 shell=True,
                 cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
             )
+            output = None
+            try:
+                output = _read_command_output(process, COMMAND_TIMEOUT)
+            finally:
+                if output is None:
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    process.wait()
+                process.stdout.close()
+                process.stderr.close()
             
+            if output is None:
+                return {
+                    "success": False,
+                    "error": f"Command timed out after {COMMAND_TIMEOUT} seconds"
+                }
+            
+            stdout, stderr = output
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "returncode": result.returncode
-            }
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "error": "Command timed out after 30 seconds"
+                "success": process.returncode == 0,
+                "stdout": stdout,
+                "stderr": stderr,
+                "returncode": process.returncode
             }
         except Exception as e:
             return {
@@ -171,26 +289,56 @@ class AgentTools:
     
     def search_files(self, pattern: str, file_pattern: str = "*") -> List[Dict[str, Any]]:
         """Search for a pattern in files"""
+        # Arguments go straight to the search tool, never through a shell
+        if self._rg_path:
+            command = [self._rg_path, '--json', '-g', file_pattern, '-e', pattern, '.']
+            parse_line = _parse_rg_line
+            env = None
+        else:
+            # -E so patterns use extended regex syntax, as they do with rg
+            command = ['grep', '-rZE', f'--include={file_pattern}',
+                       *(f'--exclude-dir={name}' for name in SEARCH_SKIP_DIRS), '-e', pattern, '.']
+            parse_line = _parse_grep_line
+            # In the C locale grep matches bytes with its DFA instead of decoding
+            # multibyte characters, which is many times faster on UTF-8 locales
+            env = {**os.environ, 'LC_ALL': 'C'}
+        
         try:
-            result = subprocess.run(
-                f"grep -r '{pattern}' --include='{file_pattern}' .",
-                shell=True,
+            process = subprocess.Popen(
+                command,
                 cwd=self.workspace_path,
-                capture_output=True,
-                text=True,
-                timeout=10
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=env
             )
+            timed_out = threading.Event()
+            
+            def stop_search():
+                timed_out.set()
+                process.kill()
+            
+            timer = threading.Timer(SEARCH_TIMEOUT, stop_search)
+            timer.start()
             
             matches = []
-            for line in result.stdout.splitlines():
-                if ':' in line:
-                    file_path, content = line.split(':', 1)
-                    matches.append({
-                        "file": file_path.lstrip('./'),
-                        "line": content.strip()
-                    })
-                    
-            return matches[:20]  # Limit results
+            try:
+                for line in process.stdout:
+                    match = parse_line(line)
+                    if match is not None:
+                        matches.append(match)
+                        # Stop the search once we have enough rather than reading every hit
+                        if len(matches) >= SEARCH_RESULT_LIMIT:
+                            break
+            finally:
+                timer.cancel()
+                process.kill()
+                process.stdout.close()
+                process.wait()
+            
+            if timed_out.is_set() and len(matches) < SEARCH_RESULT_LIMIT:
+                matches.append({"error": f"Search timed out after {SEARCH_TIMEOUT} seconds; results are incomplete"})
+            return matches
             
         except Exception as e:
             return [{"error": str(e)}]
@@ -198,15 +346,27 @@ class AgentTools:
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get information about a file"""
         path = self._validate_path(file_path)
-        if not path.exists():
+        # One stat call answers existence, type, size and mtime
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
             return {"exists": False}
             
-        stat = path.stat()
         return {
             "exists": True,
-            "is_file": path.is_file(),
-            "is_dir": path.is_dir(),
-            "size": stat.st_size,
-            "modified": stat.st_mtime,
-            "relative_path": str(path.relative_to(self.workspace_path))
-        }
\ No newline at end of file
+            "is_file": stat.S_ISREG(st.st_mode),
+            "is_dir": stat.S_ISDIR(st.st_mode),
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "relative_path": str(path.relative_to(self._resolved_workspace))
+        }
+    
+    def get_files_info(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get information about several files in one call"""
+        infos = {}
+        for file_path in file_paths:
+            try:
+                infos[file_path] = self.get_file_info(file_path)
+            except ValueError as e:
+                infos[file_path] = {"error": str(e)}
+        return infos
\ No newline at end of file
@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
-import json
+import orjson
 import os
 
 
@@ -81,8 +81,8 @@ class AppConfig(BaseModel):
     def save(self) -> None:
         """Save configuration to file"""
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.config_path, 'w') as f:
-            json.dump(self.model_dump(), f, indent=2, default=str)
+        # pydantic serializes Path and datetime fields itself, in compiled code
+        self.config_path.write_text(self.model_dump_json(indent=2), encoding="utf-8")
     
     @classmethod
     def load(cls, home_directory: Path) -> Optional['AppConfig']:
@@ -92,15 +92,14 @@ class AppConfig(BaseModel):
             return None
         
         try:
-            with open(config_path) as f:
-                data = json.load(f)
-                # Convert datetime strings back to datetime objects
-                for project_id, project_info in data.get("projects", {}).items():
-                    if "created_at" in project_info:
-                        project_info["created_at"] = datetime.fromisoformat(project_info["created_at"])
-                    if "last_accessed" in project_info:
-                        project_info["last_accessed"] = datetime.fromisoformat(project_info["last_accessed"])
-                return cls(**data)
+            data = orjson.loads(config_path.read_bytes())
+            # Convert datetime strings back to datetime objects
+            for project_id, project_info in data.get("projects", {}).items():
+                if "created_at" in project_info:
+                    project_info["created_at"] = datetime.fromisoformat(project_info["created_at"])
+                if "last_accessed" in project_info:
+                    project_info["last_accessed"] = datetime.fromisoformat(project_info["last_accessed"])
+            return cls(**data)
         except Exception as e:
             print(f"Error loading app config: {e}")
             return None
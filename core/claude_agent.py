@@ -1,8 +1,9 @@
 import asyncio
 import json
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Deque
 from enum import Enum
 
 import anthropic
@@ -11,6 +12,10 @@ from pydantic_settings import BaseSettings
 from .conversation_history import ConversationHistory
 
 
+# Number of recent messages kept in memory for the /history endpoint
+MAX_MESSAGE_HISTORY = 50
+
+
 class AgentRole(str, Enum):
     FRONTEND = "frontend"
     BACKEND = "backend"
@@ -59,13 +64,16 @@ class AgentState(BaseModel):
     task_history: List[Task] = []
     last_activity: datetime = Field(default_factory=datetime.now)
     total_tokens_used: int = 0
-    messages: List[Dict[str, Any]] = []
+    messages: Deque[Dict[str, Any]] = Field(
+        default_factory=lambda: deque(maxlen=MAX_MESSAGE_HISTORY)
+    )
 
 
 class ClaudeAgent:
     def __init__(self, settings: AgentSettings):
         self.settings = settings
-        self.client = anthropic.Anthropic(api_key=self.settings.anthropic_api_key)
+        # Async client so completions never block the event loop
+        self.client = anthropic.AsyncAnthropic(api_key=self.settings.anthropic_api_key)
         self.state = AgentState()
         self._system_prompt: Optional[str] = None
         self.conversation_history = ConversationHistory()
@@ -197,7 +205,7 @@ Guide the team but avoid implementing features directly.
                 task_context = f"\n\nCurrent task: {context['task'].title}\nDescription: {context['task'].description}"
                 messages[0]["content"] = task_context + "\n\n" + messages[0]["content"]
                 
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.settings.model,
                 max_tokens=4000,
                 temperature=0.7,
@@ -1,31 +1,76 @@
 #!/usr/bin/env python3
 """Conversation history management for agents"""
 
-import json
+import orjson
 import os
+import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from pathlib import Path
 
 
+# Number of most recent messages kept per agent
+HISTORY_LIMIT = 50
+
+# Size at which a history file is compacted down to its last HISTORY_LIMIT messages
+HISTORY_COMPACT_BYTES = 512 * 1024
+
+# A compacted file is compacted again only once it has grown to this many times
+# its compacted size, so large messages can't make every append rewrite the file
+HISTORY_COMPACT_FACTOR = 4
+
+# Block size used when reading a history file backwards from its end
+TAIL_BLOCK_SIZE = 16 * 1024
+
+# Any task-related keyword, matched in one case-insensitive pass over a message
+_TASK_KEYWORDS_RE = re.compile(
+    "task|implement|create|fix|update|change|feature|bug", re.IGNORECASE
+)
+
+
+def _read_tail_lines(path: Path, count: int) -> List[bytes]:
+    """Read the last count lines of a file without reading the whole file"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    if position > 0:
+        # The first line was cut off at the block boundary
+        lines = lines[1:]
+    return lines[-count:]
+
+
 class ConversationHistory:
     """Manages conversation history for agents"""
     
     def __init__(self, storage_dir: str = "data/conversations"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # Roles whose legacy history file has been checked for this instance
+        self._migrated_roles: Set[str] = set()
+        # Size of each role's history file right after it was last compacted
+        self._compacted_sizes: Dict[str, int] = {}
     
     def get_agent_history_file(self, agent_role: str) -> Path:
-        """Get the history file path for an agent"""
+        """Get the history file path for an agent, one JSON message per line"""
+        return self.storage_dir / f"{agent_role}_history.jsonl"
+    
+    def _get_legacy_history_file(self, agent_role: str) -> Path:
+        """Get the path of the JSON array history file used before JSON Lines"""
         return self.storage_dir / f"{agent_role}_history.json"
     
     def add_message(self, agent_role: str, user_message: str, agent_response: str, 
                    context: Optional[Dict[str, Any]] = None) -> None:
         """Add a message exchange to agent's history"""
         history_file = self.get_agent_history_file(agent_role)
-        
-        # Load existing history
-        history = self.load_agent_history(agent_role)
+        if agent_role not in self._migrated_roles:
+            self._migrate_legacy_history(agent_role)
+            self._migrated_roles.add(agent_role)
         
         # Add new message
         message_entry = {
@@ -35,28 +80,68 @@ class ConversationHistory:
             "context": context or {}
         }
         
-        history.append(message_entry)
-        
-        # Keep only last 50 messages to prevent unlimited growth
-        if len(history) > 50:
-            history = history[-50:]
+        # Append instead of rewriting the whole history on every message
+        with open(history_file, 'ab') as f:
+            f.write(orjson.dumps(message_entry) + b'\n')
+            size = f.tell()
         
-        # Save updated history
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        # Only the last HISTORY_LIMIT messages are ever read; drop older ones
+        # once the file has grown well past that
+        threshold = max(HISTORY_COMPACT_BYTES,
+                        HISTORY_COMPACT_FACTOR * self._compacted_sizes.get(agent_role, 0))
+        if size > threshold:
+            self._compacted_sizes[agent_role] = self._write_history(
+                history_file, _read_tail_lines(history_file, HISTORY_LIMIT)
+            )
+    
+    def _write_history(self, history_file: Path, lines: List[bytes]) -> int:
+        """Replace a history file with the given lines, returning its new size"""
+        tmp_file = history_file.with_name(history_file.name + ".tmp")
+        size = tmp_file.write_bytes(b''.join(line + b'\n' for line in lines))
+        os.replace(tmp_file, history_file)
+        return size
+    
+    def _migrate_legacy_history(self, agent_role: str) -> None:
+        """Convert a JSON array history file to JSON Lines"""
+        legacy_file = self._get_legacy_history_file(agent_role)
+        if not legacy_file.exists():
+            return
+        try:
+            history = orjson.loads(legacy_file.read_bytes())
+        except (orjson.JSONDecodeError, IOError):
+            history = []
+        self._write_history(
+            self.get_agent_history_file(agent_role),
+            [orjson.dumps(entry) for entry in history[-HISTORY_LIMIT:]]
+        )
+        legacy_file.unlink()
     
     def load_agent_history(self, agent_role: str) -> List[Dict[str, Any]]:
-        """Load conversation history for an agent"""
+        """Load the last HISTORY_LIMIT messages of an agent's conversation history"""
         history_file = self.get_agent_history_file(agent_role)
         
         if not history_file.exists():
-            return []
+            legacy_file = self._get_legacy_history_file(agent_role)
+            if not legacy_file.exists():
+                return []
+            try:
+                return orjson.loads(legacy_file.read_bytes())[-HISTORY_LIMIT:]
+            except (orjson.JSONDecodeError, IOError):
+                return []
         
         try:
-            with open(history_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            lines = _read_tail_lines(history_file, HISTORY_LIMIT)
+        except IOError:
             return []
+        
+        history = []
+        for line in lines:
+            try:
+                history.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # Skip a line left half-written by an interrupted append
+                continue
+        return history
     
     def get_recent_context(self, agent_role: str, hours: int = 24) -> str:
         """Get recent conversation context for an agent"""
@@ -65,17 +150,22 @@ class ConversationHistory:
         if not history:
             return "No previous conversation history."
         
-        # Filter messages from the last N hours
+        # Last 10 messages from the last N hours. Messages are appended in
+        # time order, so scan from the newest and stop at the cutoff
         cutoff_time = datetime.now() - timedelta(hours=hours)
         recent_messages = []
         
-        for entry in history:
+        for entry in reversed(history):
             try:
                 msg_time = datetime.fromisoformat(entry["timestamp"])
-                if msg_time > cutoff_time:
-                    recent_messages.append(entry)
             except (ValueError, KeyError):
                 continue
+            if msg_time <= cutoff_time:
+                break
+            recent_messages.append(entry)
+            if len(recent_messages) == 10:
+                break
+        recent_messages.reverse()
         
         if not recent_messages:
             return f"No conversation history in the last {hours} hours."
@@ -83,7 +173,7 @@ class ConversationHistory:
         # Format context for the agent
         context_parts = ["## Recent Conversation History\n"]
         
-        for entry in recent_messages[-10:]:  # Last 10 messages
+        for entry in recent_messages:
             timestamp = entry.get("timestamp", "unknown")
             user_msg = entry.get("user_message", "")
             agent_resp = entry.get("agent_response", "")
@@ -109,14 +199,11 @@ class ConversationHistory:
             return "No task history available."
         
         # Look for task-related keywords in recent messages
-        task_keywords = ["task", "implement", "create", "fix", "update", "change", "feature", "bug"]
         task_messages = []
         
         for entry in history[-20:]:  # Check last 20 messages
-            user_msg = entry.get("user_message", "").lower()
-            agent_resp = entry.get("agent_response", "").lower()
-            
-            if any(keyword in user_msg or keyword in agent_resp for keyword in task_keywords):
+            if (_TASK_KEYWORDS_RE.search(entry.get("user_message", ""))
+                    or _TASK_KEYWORDS_RE.search(entry.get("agent_response", ""))):
                 task_messages.append(entry)
         
         if not task_messages:
@@ -135,16 +222,21 @@ class ConversationHistory:
     
     def clear_agent_history(self, agent_role: str) -> None:
         """Clear conversation history for an agent"""
-        history_file = self.get_agent_history_file(agent_role)
-        if history_file.exists():
-            history_file.unlink()
+        for history_file in (self.get_agent_history_file(agent_role),
+                             self._get_legacy_history_file(agent_role)):
+            if history_file.exists():
+                history_file.unlink()
     
     def get_all_agents_summary(self) -> Dict[str, Dict[str, Any]]:
         """Get summary of all agents' recent activity"""
         summary = {}
         
-        for history_file in self.storage_dir.glob("*_history.json"):
-            agent_role = history_file.stem.replace("_history", "")
+        agent_roles = {
+            history_file.stem.replace("_history", "")
+            for pattern in ("*_history.jsonl", "*_history.json")
+            for history_file in self.storage_dir.glob(pattern)
+        }
+        for agent_role in sorted(agent_roles):
             history = self.load_agent_history(agent_role)
             
             if history:
@@ -4,7 +4,8 @@
 import os
 import subprocess
 import json
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 
@@ -180,4 +181,18 @@ Created by {agent_role} agent"""
         except subprocess.CalledProcessError as e:
             # PR creation failed, but that's okay - the branch is still pushed
             print(f"Warning: Could not create PR automatically: {e}")
-            return None
\ No newline at end of file
+            return None
+
+_git_helpers: Dict[Tuple[str, str], GitHelper] = {}
+_git_helpers_lock = threading.Lock()
+
+
+def get_git_helper(workspace_path: str, git_config: Dict[str, Any]) -> GitHelper:
+    """Get a shared GitHelper for a workspace, running its git setup only once per process"""
+    key = (os.path.realpath(workspace_path), json.dumps(git_config, sort_keys=True, default=str))
+    with _git_helpers_lock:
+        helper = _git_helpers.get(key)
+        if helper is None:
+            helper = GitHelper(workspace_path, git_config)
+            _git_helpers[key] = helper
+        return helper
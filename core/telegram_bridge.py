@@ -12,6 +12,8 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+ROLE_MESSAGE_PATTERN = re.compile(r'@(\w+)\s+(.*)')
+
 
 class TelegramSettings(BaseModel):
     bot_token: str
@@ -143,7 +145,7 @@ class TelegramBridge:
         message = update.message.text
         
         # Check for @role pattern
-        match = re.match(r'@(\w+)\s+(.*)', message)
+        match = ROLE_MESSAGE_PATTERN.match(message)
         if not match:
             return
             
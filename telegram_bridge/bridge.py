@@ -14,6 +14,8 @@ import certifi
 
 logger = logging.getLogger(__name__)
 
+MENTION_PATTERN = re.compile(r'@(\w+)')
+
 
 class TelegramBridge:
     """Bridge between Telegram and DevTeam agents"""
@@ -84,7 +86,7 @@ class TelegramBridge:
         user = update.message.from_user
         
         # Look for @mentions
-        mentions = re.findall(r'@(\w+)', text)
+        mentions = MENTION_PATTERN.findall(text)
         if not mentions:
             return
         
@@ -32,7 +32,7 @@ def temp_dir():
 @pytest.fixture
 def mock_anthropic_client():
     """Mock Anthropic client"""
-    with patch('anthropic.Anthropic') as mock:
+    with patch('anthropic.AsyncAnthropic') as mock:
         client = Mock()
         mock.return_value = client
         
@@ -41,7 +41,7 @@ def mock_anthropic_client():
         response.content = [Mock(text="Test response from Claude")]
         response.usage = Mock(input_tokens=10, output_tokens=20)
         
-        client.messages.create = Mock(return_value=response)
+        client.messages.create = AsyncMock(return_value=response)
         yield client
 
 
@@ -65,7 +65,7 @@ def claude_agent(agent_settings, mock_anthropic_client, temp_dir):
     Path(agent_settings.claude_file).write_text("# Test prompt")
     
     # Patch conversation history to use temp directory
-    with patch('anthropic.Anthropic', return_value=mock_anthropic_client):
+    with patch('anthropic.AsyncAnthropic', return_value=mock_anthropic_client):
         with patch('core.claude_agent.ConversationHistory') as mock_conv_history:
             mock_conv_history.return_value.get_recent_context.return_value = "No previous conversation history."
             mock_conv_history.return_value.get_task_context.return_value = "No recent task-related conversation found."
@@ -348,6 +348,7 @@ This is the project-specific backend template.""")
         
         project_manager = ProjectManager(app_config)
         agent_manager = AgentManager(app_config)
+        agent_manager.port_lock_dir = temp_home / "ports"
         
         # Create project with agents
         project_id = project_manager.create_project(
@@ -1,6 +1,7 @@
 """Unit tests for Agent API"""
 
 import pytest
+from collections import deque
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi.testclient import TestClient
 
@@ -145,7 +146,9 @@ class TestAgentAPI:
     def test_history_endpoint_limit(self, api_client, mock_agent):
         """Test history endpoint respects message limit"""
         # Create 100 messages
-        mock_agent.state.messages = [{"message": f"msg{i}"} for i in range(100)]
+        mock_agent.state.messages = deque(
+            ({"message": f"msg{i}"} for i in range(100)), maxlen=50
+        )
         
         response = api_client.get("/history")
         data = response.json()
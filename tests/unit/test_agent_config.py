@@ -0,0 +1,35 @@
+"""Unit tests for AgentConfiguration"""
+
+import os
+
+from core.agent_config import AgentConfiguration
+
+
+class TestAgentConfigurationLoad:
+    """Test loading agent configuration files"""
+
+    def test_load_missing_file(self, temp_dir):
+        """Test loading a missing file returns None"""
+        assert AgentConfiguration.load(temp_dir / "missing.json") is None
+
+    def test_load_round_trip(self, temp_dir):
+        """Test a saved configuration loads back"""
+        config_path = temp_dir / "agent.json"
+        AgentConfiguration.get_default_for_role("qa-1", "qa").save(config_path)
+
+        loaded = AgentConfiguration.load(config_path)
+        assert loaded.agent_id == "qa-1"
+        assert "pytest" in loaded.permissions.allowed_commands
+
+    def test_load_cached_until_modified(self, temp_dir):
+        """Test the parsed configuration is reused until the file changes"""
+        config_path = temp_dir / "agent.json"
+        AgentConfiguration(agent_id="first").save(config_path)
+
+        first = AgentConfiguration.load(config_path)
+        assert AgentConfiguration.load(config_path) is first
+
+        AgentConfiguration(agent_id="second").save(config_path)
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert AgentConfiguration.load(config_path).agent_id == "second"
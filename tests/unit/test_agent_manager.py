@@ -6,9 +6,14 @@ from pathlib import Path
 import subprocess
 import json
 import tempfile
+import os
 import socket
+import sys
+import threading
+import time
+import httpx
 
-from core.agent_manager import AgentManager
+from core.agent_manager import AgentManager, PortLock
 from core.app_config import AppConfig, TokenConfig
 from core.project_config import ProjectConfig, AgentInfo, TelegramConfig
 
@@ -56,9 +61,11 @@ class TestAgentManager:
         return config
     
     @pytest.fixture
-    def agent_manager(self, app_config):
-        """Create AgentManager instance"""
-        return AgentManager(app_config)
+    def agent_manager(self, app_config, temp_dir):
+        """Create AgentManager instance with port locks in a temp directory"""
+        manager = AgentManager(app_config)
+        manager.port_lock_dir = temp_dir / "ports"
+        return manager
     
     def test_init(self, app_config):
         """Test AgentManager initialization"""
@@ -70,7 +77,7 @@ class TestAgentManager:
         assert manager.allocated_ports == {}
     
     @patch('pathlib.Path.exists')
-    @patch('core.agent_manager.AgentManager._is_process_running')
+    @patch('core.agent_manager.AgentManager._pid_alive')
     def test_load_pid_file(self, mock_is_running, mock_exists, app_config):
         """Test loading PID file"""
         mock_is_running.return_value = True
@@ -84,8 +91,8 @@ class TestAgentManager:
         assert manager.running_processes["test-project"]["agent1"] == 1234
     
     @patch('builtins.open', mock_open())
-    @patch('json.dump')
-    def test_save_pid_file(self, mock_json_dump, agent_manager):
+    @patch('core.agent_manager.orjson.dumps', return_value=b'{}')
+    def test_save_pid_file(self, mock_dumps, agent_manager):
         """Test saving PID file"""
         # Create a proper subprocess.Popen mock
         import subprocess
@@ -100,12 +107,45 @@ class TestAgentManager:
         
         agent_manager._save_pid_file()
         
-        # Check json.dump was called with correct data
-        mock_json_dump.assert_called_once()
-        saved_data = mock_json_dump.call_args[0][0]
+        # Check the state was serialized with the correct data
+        mock_dumps.assert_called_once()
+        saved_data = mock_dumps.call_args[0][0]
         assert saved_data["project1"]["agent1"] == 5678
         assert saved_data["project1"]["agent2"] == 9999
     
+    def test_save_state_atomic(self, app_config, temp_dir):
+        """Test state files are replaced whole and only written when changed"""
+        app_config.home_directory = temp_dir
+        manager = AgentManager(app_config)
+        manager.running_processes = {"project1": {"agent1": 1234}}
+        manager.allocated_ports = {"project1": {"agent1": 8301}}
+        
+        manager._flush_state()
+        assert not manager.pid_file.exists()
+        
+        manager._pids_dirty = manager._ports_dirty = True
+        manager._flush_state()
+        assert json.loads(manager.pid_file.read_text()) == {"project1": {"agent1": 1234}}
+        assert json.loads(manager.port_file.read_text()) == {"project1": {"agent1": 8301}}
+        assert not list(temp_dir.glob("*.tmp"))
+        assert not manager._pids_dirty and not manager._ports_dirty
+    
+    @patch('core.agent_manager.subprocess.Popen')
+    @patch('core.agent_manager.ProjectConfig.load')
+    def test_start_project_agents_saves_state_once(self, mock_load, mock_popen, agent_manager, project_config):
+        """Test restarting a project saves the PID and port files once"""
+        mock_load.return_value = project_config
+        mock_popen.return_value = Mock(pid=1234)
+        agent_manager.running_processes["test-project"] = {"old-agent": Mock()}
+        
+        with patch('builtins.open', mock_open()), \
+             patch.object(agent_manager, '_save_pid_file') as save_pids, \
+             patch.object(agent_manager, '_save_port_file') as save_ports:
+            agent_manager.start_project_agents("test-project")
+        
+        save_pids.assert_called_once()
+        save_ports.assert_called_once()
+    
     @patch('psutil.Process')
     def test_is_process_running(self, mock_process, agent_manager):
         """Test process running check"""
@@ -126,6 +166,38 @@ class TestAgentManager:
         mock_process.side_effect = psutil.NoSuchProcess(9999)
         assert agent_manager._is_process_running(9999) is False
     
+    @patch('psutil.process_iter')
+    def test_snapshot_agent_pids(self, mock_process_iter, agent_manager):
+        """Test one process table scan finds agent processes"""
+        mock_process_iter.return_value = [
+            Mock(info={'pid': 1234, 'cmdline': ['python', 'agents/run_project_agent.py']}),
+            Mock(info={'pid': 2345, 'cmdline': ['python', 'telegram_bridge/start_project_bridge.py']}),
+            Mock(info={'pid': 3456, 'cmdline': ['python', 'some_other_script.py']}),
+            Mock(info={'pid': 4567, 'cmdline': None})  # cmdline not readable
+        ]
+        
+        assert set(agent_manager._snapshot_agent_pids()) == {1234, 2345, 4567}
+    
+    @patch('psutil.Process')
+    @patch('psutil.process_iter')
+    def test_get_all_projects_status_uses_snapshot(self, mock_process_iter, mock_process, agent_manager):
+        """Test PID-only agents are checked against a single process scan"""
+        mock_process_iter.return_value = [
+            Mock(info={'pid': 1234, 'cmdline': ['python', 'agents/run_project_agent.py']})
+        ]
+        agent_manager.app_config.projects = {"project1": Mock(), "project2": Mock()}
+        agent_manager.running_processes = {
+            "project1": {"agent1": 1234},
+            "project2": {"agent2": 5678}
+        }
+        
+        all_status = agent_manager.get_all_projects_status()
+        
+        assert all_status["project1"]["agents"]["agent1"]["running"] is True
+        assert all_status["project2"]["agents"]["agent2"]["running"] is False
+        mock_process_iter.assert_called_once()
+        mock_process.assert_not_called()
+    
     @patch('core.agent_manager.subprocess.Popen')
     @patch('core.agent_manager.ProjectConfig.load')
     @patch('builtins.open', mock_open())
@@ -152,6 +224,15 @@ class TestAgentManager:
         assert env['DEVTEAM_PROJECT_ID'] == 'test-project'
         assert env['DEVTEAM_AGENT_ROLE'] == 'backend'
         assert env['DEVTEAM_AGENT_NAME'] == 'Alex'
+        
+        # Each agent gets its own environment on top of the shared project one
+        second_env = mock_popen.call_args_list[1][1]['env']
+        assert second_env['DEVTEAM_PROJECT_ID'] == 'test-project'
+        assert second_env['DEVTEAM_AGENT_NAME'] == 'Sarah'
+        assert second_env['AGENT_PORT'] != env['AGENT_PORT']
+        
+        # Agent output goes straight to an unbuffered log file
+        open.assert_any_call(agent_manager._logs_dir / 'test-project_backend-alex.log', 'wb', buffering=0)
     
     @patch('core.agent_manager.subprocess.Popen')
     @patch('core.agent_manager.ProjectConfig.load')
@@ -179,6 +260,7 @@ class TestAgentManager:
         """Test stopping agents for a project"""
         # Set up running processes
         mock_popen_process = Mock(spec=subprocess.Popen)
+        mock_popen_process.pid = 1234
         agent_manager.running_processes["test-project"] = {
             "agent1": mock_popen_process,
             "agent2": 5678  # PID only
@@ -186,6 +268,7 @@ class TestAgentManager:
         
         # Mock psutil Process for PID
         mock_psutil_process = Mock()
+        mock_psutil_process.cmdline.return_value = ['python', 'agents/run_project_agent.py']
         mock_process_class.return_value = mock_psutil_process
         
         results = agent_manager.stop_project_agents("test-project")
@@ -198,6 +281,46 @@ class TestAgentManager:
         mock_popen_process.terminate.assert_called_once()
         mock_psutil_process.terminate.assert_called_once()
     
+    @patch('core.agent_manager.AGENT_STOP_TIMEOUT', 0.5)
+    def test_stop_project_agents_waits_together(self, agent_manager):
+        """Test agents ignoring SIGTERM are killed after one shared timeout"""
+        script = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(flush=True); time.sleep(60)"
+        processes = [subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE) for _ in range(3)]
+        for process in processes:
+            process.stdout.readline()
+            process.stdout.close()
+        agent_manager.running_processes["test-project"] = {
+            f"agent{i}": process for i, process in enumerate(processes)
+        }
+        
+        started = time.monotonic()
+        results = agent_manager.stop_project_agents("test-project")
+        
+        assert time.monotonic() - started < 2.0
+        assert set(results.values()) == {"stopped"}
+        assert all(process.returncode is not None for process in processes)
+    
+    @patch('psutil.Process')
+    def test_stop_project_agents_reused_pid(self, mock_process_class, agent_manager):
+        """Test a recovered PID that now belongs to another program is not signalled"""
+        mock_psutil_process = Mock()
+        mock_psutil_process.cmdline.return_value = ['vim']
+        mock_process_class.return_value = mock_psutil_process
+        agent_manager.running_processes["test-project"] = {"agent1": 5678}
+        
+        agent_manager.stop_project_agents("test-project")
+        
+        mock_psutil_process.terminate.assert_not_called()
+    
+    def test_pid_alive(self, agent_manager):
+        """Test PID liveness check"""
+        assert agent_manager._pid_alive(os.getpid()) is True
+        
+        with patch('os.kill', side_effect=ProcessLookupError):
+            assert agent_manager._pid_alive(99999) is False
+        with patch('os.kill', side_effect=PermissionError):
+            assert agent_manager._pid_alive(1) is True
+    
     def test_stop_project_agents_no_agents(self, agent_manager):
         """Test stopping agents when none are running"""
         results = agent_manager.stop_project_agents("test-project")
@@ -225,6 +348,141 @@ class TestAgentManager:
         assert status["agent2"]["running"] is False
         assert status["agent2"]["pid"] == 5678
     
+    def test_get_project_status_fetches_agent_info(self, agent_manager):
+        """Test branch info is fetched from running agents over the shared client"""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"branch": "agent/backend/task", "has_changes": True})
+        
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        agent_manager._status_client = client
+        agent_manager._port_alive = Mock(return_value=True)
+        
+        mock_process = Mock(spec=subprocess.Popen)
+        mock_process.poll.return_value = None
+        mock_process.pid = 1234
+        agent_manager.running_processes["test-project"] = {
+            "agent1": mock_process,
+            "agent2": mock_process
+        }
+        agent_manager.allocated_ports["test-project"] = {"agent1": 8301, "agent2": 8302}
+        
+        status = agent_manager.get_project_status("test-project")
+        
+        assert status["agent1"]["branch"] == "agent/backend/task"
+        assert status["agent2"]["has_changes"] is True
+        assert sorted(r.url.port for r in requests) == [8301, 8302]
+        assert agent_manager._get_status_client() is client
+    
+    def test_get_all_projects_status_polls_concurrently(self, agent_manager):
+        """Test agents across projects are queried in parallel"""
+        # Each request waits for the other, so this only passes if they overlap
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def handler(request):
+            barrier.wait()
+            return httpx.Response(200, json={"branch": f"branch-{request.url.port}"})
+        
+        agent_manager._status_client = httpx.Client(transport=httpx.MockTransport(handler))
+        agent_manager.app_config.projects = {"project1": Mock(), "project2": Mock()}
+        agent_manager._port_alive = Mock(return_value=True)
+        
+        mock_process = Mock(spec=subprocess.Popen)
+        mock_process.poll.return_value = None
+        mock_process.pid = 1234
+        agent_manager.running_processes = {
+            "project1": {"agent1": mock_process},
+            "project2": {"agent2": mock_process}
+        }
+        agent_manager.allocated_ports = {"project1": {"agent1": 8301}, "project2": {"agent2": 8302}}
+        
+        all_status = agent_manager.get_all_projects_status()
+        
+        assert all_status["project1"]["agents"]["agent1"]["branch"] == "branch-8301"
+        assert all_status["project2"]["agents"]["agent2"]["branch"] == "branch-8302"
+    
+    def test_collect_status_batch_single_fan_out(self, agent_manager):
+        """Test running agents of all projects are queried in one batch"""
+        agent_manager.app_config.projects = {"project1": Mock(), "project2": Mock()}
+        agent_manager._fetch_agent_info = Mock()
+        
+        mock_process = Mock(spec=subprocess.Popen)
+        mock_process.poll.return_value = None
+        mock_process.pid = 1234
+        agent_manager.running_processes = {
+            "project1": {"agent1": mock_process},
+            "project2": {"agent2": mock_process}
+        }
+        agent_manager.allocated_ports = {"project1": {"agent1": 8301}, "project2": {"agent2": 8302}}
+        
+        statuses = agent_manager._collect_status_batch()
+        
+        assert set(statuses) == {"project1", "project2"}
+        agent_manager._fetch_agent_info.assert_called_once()
+        targets = agent_manager._fetch_agent_info.call_args[0][0]
+        assert sorted(port for _, _, port in targets) == [8301, 8302]
+    
+    def test_get_project_status_cached(self, agent_manager):
+        """Test status is reused within the TTL and dropped when agents stop"""
+        mock_process = Mock(spec=subprocess.Popen)
+        mock_process.poll.return_value = None
+        mock_process.pid = 1234
+        agent_manager.running_processes = {"test-project": {"agent1": mock_process}}
+        agent_manager._collect_project_status = Mock(wraps=agent_manager._collect_project_status)
+        
+        first = agent_manager.get_project_status("test-project")
+        assert agent_manager.get_project_status("test-project") is first
+        assert agent_manager.get_all_projects_status()["test-project"]["agents"] is first
+        agent_manager._collect_project_status.assert_called_once()
+        
+        agent_manager.stop_project_agents("test-project")
+        assert agent_manager.get_project_status("test-project") == {"status": "no agents running"}
+    
+    @patch('core.agent_manager.STATUS_CACHE_TTL', 0.0)
+    def test_get_project_status_cache_expired(self, agent_manager):
+        """Test status is collected again once the TTL has passed"""
+        agent_manager._collect_project_status = Mock(return_value=({}, []))
+        
+        agent_manager.get_project_status("test-project")
+        agent_manager.get_project_status("test-project")
+        
+        assert agent_manager._collect_project_status.call_count == 2
+    
+    def test_get_project_status_skips_closed_port(self, agent_manager):
+        """Test no HTTP request is made to an agent that is not listening"""
+        agent_manager._status_client = Mock()
+        mock_process = Mock(spec=subprocess.Popen)
+        mock_process.poll.return_value = None
+        mock_process.pid = 1234
+        agent_manager.running_processes["test-project"] = {"agent1": mock_process}
+        
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            closed_port = s.getsockname()[1]
+        agent_manager.allocated_ports["test-project"] = {"agent1": closed_port}
+        
+        status = agent_manager.get_project_status("test-project")
+        
+        assert status["agent1"] == {"running": True, "pid": 1234}
+        agent_manager._status_client.get.assert_not_called()
+    
+    def test_port_alive(self, agent_manager):
+        """Test a listening port is reported alive"""
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            s.listen()
+            assert agent_manager._port_alive(s.getsockname()[1])
+    
+    def test_stop_all_agents_closes_status_client(self, agent_manager):
+        """Test stopping all agents releases the status client"""
+        client = agent_manager._get_status_client()
+        agent_manager.stop_all_agents()
+        
+        assert client.is_closed
+        assert agent_manager._status_client is None
+    
     def test_get_project_status_no_agents(self, agent_manager):
         """Test getting status when no agents are running"""
         status = agent_manager.get_project_status("test-project")
@@ -276,14 +534,135 @@ class TestAgentManager:
         """Test finding available port"""
         # Mock socket to simulate port availability
         mock_sock_instance = Mock()
-        mock_socket.return_value.__enter__.return_value = mock_sock_instance
+        mock_socket.return_value = mock_sock_instance
         
         # First port is taken, second is available
-        mock_sock_instance.bind.side_effect = [OSError(), None]
+        def bind(address):
+            if address[1] == 8301:
+                raise OSError()
+        mock_sock_instance.bind.side_effect = bind
         
         port = agent_manager._find_available_port(8301, 8302)
         assert port == 8302
+    
+    def test_find_available_port_ephemeral_fallback(self, agent_manager):
+        """Test a kernel-assigned port is used once the range is exhausted"""
+        agent_manager._used_ports = {8301, 8302}
+        
+        port = agent_manager._find_available_port(8301, 8302)
+        assert port not in (8301, 8302)
+        assert port in agent_manager._port_locks
+        agent_manager._port_locks.pop(port).release()
+        
+    @patch('socket.socket')
+    def test_find_available_port_skips_locked(self, mock_socket, agent_manager):
+        """Test ports locked by another manager are not handed out"""
+        other = PortLock(agent_manager.port_lock_dir, 8301)
+        assert other.acquire()
+        
+        try:
+            assert agent_manager._find_available_port(8301, 8302) == 8302
+            assert 8302 in agent_manager._port_locks
+        finally:
+            other.release()
+    
+    @patch('core.agent_manager.subprocess.Popen')
+    @patch('core.agent_manager.ProjectConfig.load')
+    @patch('builtins.open', mock_open())
+    def test_used_ports_tracked(self, mock_load, mock_popen, agent_manager, project_config):
+        """Test allocated ports are tracked on start and freed on stop"""
+        mock_load.return_value = project_config
+        mock_popen.return_value = Mock(pid=1234)
+        
+        agent_manager.start_project_agents("test-project")
+        ports = set(agent_manager.allocated_ports["test-project"].values())
+        assert agent_manager._used_ports == ports
+        assert agent_manager._find_available_port() not in ports
+        
+        agent_manager.stop_project_agents("test-project")
+        assert agent_manager._used_ports == set()
+    
+    def test_allocate_port_replaces_taken_port(self, agent_manager):
+        """Test a taken previous port is swapped out of the used ports set"""
+        agent_manager.allocated_ports = {"test-project": {"agent1": 8301}}
+        agent_manager._used_ports = {8301}
+        agent_manager._reserve_port = Mock(return_value=False)
+        agent_manager._find_available_port = Mock(return_value=8350)
+        agent_manager._port_locks[8350] = PortLock(agent_manager.port_lock_dir, 8350)
+        
+        port_lock = agent_manager._allocate_port("test-project", "agent1")
+        
+        assert port_lock.port == 8350
+        assert agent_manager.allocated_ports["test-project"]["agent1"] == 8350
+        assert agent_manager._used_ports == {8350}
+        assert 8350 not in agent_manager._port_locks
+    
+    def test_allocate_port_failure_keeps_used_ports(self, agent_manager):
+        """Test a failed port search leaves the previous port tracked"""
+        agent_manager.allocated_ports = {"test-project": {"agent1": 8301}}
+        agent_manager._used_ports = {8301}
+        agent_manager._reserve_port = Mock(return_value=False)
+        agent_manager._find_available_port = Mock(side_effect=RuntimeError("No available ports"))
+        
+        with pytest.raises(RuntimeError):
+            agent_manager._allocate_port("test-project", "agent1")
+        
+        assert agent_manager.allocated_ports["test-project"]["agent1"] == 8301
+        assert agent_manager._used_ports == {8301}
+    
+    def test_used_ports_loaded(self, app_config, temp_dir):
+        """Test ports from the port file are marked as used"""
+        app_config.home_directory = temp_dir
+        (temp_dir / ".agent_ports.json").write_text('{"p1": {"a1": 8301}, "p2": {"a2": 8305}}')
+        
+        manager = AgentManager(app_config)
+        assert manager._used_ports == {8301, 8305}
+    
+    def test_port_lock_exclusive(self, temp_dir):
+        """Test a port lock can only be held by one owner at a time"""
+        first = PortLock(temp_dir, 8301)
+        second = PortLock(temp_dir, 8301)
+        
+        assert first.acquire()
+        assert not second.acquire()
+        first.release()
+        assert second.acquire()
+        second.release()
+    
+    @patch('core.agent_manager.subprocess.Popen')
+    @patch('core.agent_manager.ProjectConfig.load')
+    @patch('builtins.open', mock_open())
+    def test_start_project_agents_hands_port_lock_to_agent(self, mock_load, mock_popen,
+                                                            agent_manager, project_config):
+        """Test each agent inherits its port lock and listening socket"""
+        mock_load.return_value = project_config
+        mock_popen.return_value = Mock(pid=1234)
+        
+        agent_manager.start_project_agents("test-project")
+        
+        for call in mock_popen.call_args_list:
+            lock_fd, listen_fd = call[1]['pass_fds']
+            assert call[1]['env']['AGENT_LISTEN_FD'] == str(listen_fd)
+        assert agent_manager._port_locks == {}
+        # With the (mocked) agents not holding them, the locks are free again
+        for port in agent_manager.allocated_ports["test-project"].values():
+            port_lock = PortLock(agent_manager.port_lock_dir, port)
+            assert port_lock.acquire()
+            port_lock.release()
+    
+    def test_log_file(self, app_config, temp_dir):
+        """Test the logs directory is created on first use only"""
+        app_config.home_directory = temp_dir
+        manager = AgentManager(app_config)
+        assert not (temp_dir / "logs").exists()
+        
+        assert manager._log_file("p1_agent1") == temp_dir / "logs" / "p1_agent1.log"
+        assert (temp_dir / "logs").is_dir()
         
+        with patch.object(Path, 'mkdir') as mock_mkdir:
+            manager._log_file("p1_agent2")
+        mock_mkdir.assert_not_called()
+    
     def test_port_allocation(self, agent_manager):
         """Test dynamic port allocation tracking"""
         # Test initial state
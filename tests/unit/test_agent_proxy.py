@@ -0,0 +1,181 @@
+"""Unit tests for the agent proxy"""
+
+import asyncio
+import time
+
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+
+import agent_proxy
+
+
+def make_client(handler) -> httpx.AsyncClient:
+    """Create an AsyncClient backed by a mock transport"""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAgentProxy:
+    """Test agent proxy functionality"""
+
+    @pytest.fixture
+    def calls(self):
+        """Record of requests seen by the mock transport"""
+        return []
+
+    @pytest.fixture
+    def proxy_client(self, calls):
+        """Create test client with a mocked shared HTTP client"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if request.url.port == 8301:
+                if request.url.path == "/ask":
+                    return httpx.Response(200, json={"response": "pong"})
+                return httpx.Response(200, json={"agent": "backend"})
+            raise httpx.ConnectError("connection refused", request=request)
+
+        agent_proxy._status_cache.clear()
+        agent_proxy._offline_since.clear()
+        with TestClient(agent_proxy.app) as client:
+            original = agent_proxy.app.state.client
+            agent_proxy.app.state.client = make_client(handler)
+            yield client
+            agent_proxy.app.state.client = original
+
+    def test_lifespan_creates_shared_client(self):
+        """Test lifespan handler manages the shared client"""
+        with TestClient(agent_proxy.app):
+            client = agent_proxy.app.state.client
+            assert isinstance(client, httpx.AsyncClient)
+            assert not client.is_closed
+        assert client.is_closed
+
+    def test_get_agents(self, proxy_client):
+        """Test agents listing reports running and offline agents"""
+        response = proxy_client.get("/agents")
+        assert response.status_code == 200
+        statuses = {a["role"]: a["status"] for a in response.json()}
+        assert statuses["backend"] == "running"
+        assert statuses["frontend"] == "offline"
+
+    def test_get_agents_cached(self, proxy_client, calls):
+        """Test repeated polls within the TTL reuse cached results"""
+        proxy_client.get("/agents")
+        probes = len(calls)
+        response = proxy_client.get("/agents")
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("max-age=")
+        assert len(calls) == probes
+
+    def test_get_agents_cache_expired(self, proxy_client, calls, monkeypatch):
+        """Test agents are probed again once the TTL has passed"""
+        monkeypatch.setattr(agent_proxy, "CACHE_TTL", 0.0)
+        monkeypatch.setattr(agent_proxy, "STALE_TTL", 0.0)
+        monkeypatch.setattr(agent_proxy, "OFFLINE_BACKOFF", 0.0)
+        proxy_client.get("/agents")
+        probes = len(calls)
+        proxy_client.get("/agents")
+        assert len(calls) == 2 * probes
+
+    def test_offline_agents_backoff(self, proxy_client, calls, monkeypatch):
+        """Test offline agents are not probed again during the backoff"""
+        monkeypatch.setattr(agent_proxy, "CACHE_TTL", 0.0)
+        monkeypatch.setattr(agent_proxy, "STALE_TTL", 0.0)
+        monkeypatch.setattr(agent_proxy, "OFFLINE_BACKOFF", 60.0)
+        proxy_client.get("/agents")
+        assert len(calls) == len(agent_proxy.AGENTS)
+        
+        response = proxy_client.get("/agents")
+        statuses = {a["role"]: a["status"] for a in response.json()}
+        assert statuses["frontend"] == "offline"
+        # Only the running backend agent is probed again
+        assert len(calls) == len(agent_proxy.AGENTS) + 1
+
+    @pytest.mark.asyncio
+    async def test_offline_response_is_a_copy(self, monkeypatch):
+        """Test changing a returned offline status doesn't change later ones"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused", request=request)
+
+        monkeypatch.setattr(agent_proxy, "OFFLINE_BACKOFF", 60.0)
+        agent_proxy._offline_since.clear()
+        agent = agent_proxy.AGENTS_BY_ROLE["frontend"]
+        async with make_client(handler) as client:
+            first = await agent_proxy.check_agent_status(client, agent)
+            first["status"] = "running"
+            second = await agent_proxy.check_agent_status(client, agent)
+
+        assert second["status"] == "offline"
+        assert agent["_offline_response"]["status"] == "offline"
+
+    def test_get_agents_stale_while_revalidate(self, proxy_client, calls, monkeypatch):
+        """Test stale results are served while a background refresh runs"""
+        monkeypatch.setattr(agent_proxy, "CACHE_TTL", 0.0)
+        monkeypatch.setattr(agent_proxy, "STALE_TTL", 60.0)
+        monkeypatch.setattr(agent_proxy, "OFFLINE_BACKOFF", 0.0)
+        first = proxy_client.get("/agents").json()
+        probes = len(calls)
+        
+        response = proxy_client.get("/agents")
+        assert response.json() == first
+        assert "stale-while-revalidate=60" in response.headers["cache-control"]
+        
+        deadline = time.monotonic() + 2.0
+        while len(calls) < 2 * probes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 2 * probes
+
+    def test_get_agents_deadline(self, calls, monkeypatch):
+        """Test agents slower than the deadline are reported offline"""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if request.url.port == 8302:
+                await asyncio.sleep(2.0)
+            return httpx.Response(200, json={})
+
+        monkeypatch.setattr(agent_proxy, "PROBE_DEADLINE", 0.3)
+        agent_proxy._status_cache.clear()
+        agent_proxy._offline_since.clear()
+        with TestClient(agent_proxy.app) as client:
+            original = agent_proxy.app.state.client
+            agent_proxy.app.state.client = make_client(handler)
+            started = time.monotonic()
+            response = client.get("/agents")
+            elapsed = time.monotonic() - started
+            agent_proxy.app.state.client = original
+
+        statuses = {a["role"]: a["status"] for a in response.json()}
+        assert elapsed < 1.5
+        assert statuses["backend"] == "running"
+        assert statuses["frontend"] == "offline"
+
+    def test_cors_allows_ui_origin(self, proxy_client):
+        """Test CORS preflight succeeds for the web UI origin only"""
+        headers = {"Access-Control-Request-Method": "GET"}
+        response = proxy_client.options(
+            "/agents", headers={"Origin": "http://localhost:3000", **headers}
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+        response = proxy_client.options(
+            "/agents", headers={"Origin": "http://evil.example", **headers}
+        )
+        assert response.status_code == 400
+
+    def test_get_unknown_agent(self, proxy_client):
+        """Test unknown role returns 404"""
+        response = proxy_client.get("/agents/unknown")
+        assert response.status_code == 404
+
+    def test_ask_agent(self, proxy_client, calls):
+        """Test messages are forwarded through the shared client"""
+        response = proxy_client.post("/agents/backend/ask", json={"message": "ping"})
+        assert response.status_code == 200
+        assert response.json() == {"response": "pong"}
+        assert calls[-1].url.path == "/ask"
+
+    def test_ask_offline_agent(self, proxy_client):
+        """Test forwarding to an offline agent returns 503"""
+        response = proxy_client.post("/agents/frontend/ask", json={"message": "ping"})
+        assert response.status_code == 503
@@ -0,0 +1,237 @@
+"""Unit tests for AgentTools"""
+
+import time
+
+import psutil
+import pytest
+
+from core.agent_tools import AgentTools, DEFAULT_ALLOWED_COMMANDS, _parse_rg_line
+
+
+class TestAgentToolsCommands:
+    """Test command permission checks"""
+
+    def test_default_commands_used(self, temp_dir):
+        """Test default safe commands apply when none are configured"""
+        tools = AgentTools(str(temp_dir))
+        assert tools._allowed_command_set is DEFAULT_ALLOWED_COMMANDS
+
+        result = tools.execute_command("ls")
+        assert result["success"]
+
+    def test_configured_commands(self, temp_dir):
+        """Test only configured commands are allowed"""
+        tools = AgentTools(str(temp_dir), allowed_commands=["ls"])
+
+        assert tools.execute_command("ls -a")["success"]
+        with pytest.raises(ValueError, match="Command not allowed: git"):
+            tools.execute_command("git status")
+
+    def test_python_module_command(self, temp_dir):
+        """Test python -m commands are matched on the module name"""
+        tools = AgentTools(str(temp_dir), allowed_commands=["python -m pytest"])
+
+        with pytest.raises(ValueError, match="Command not allowed: python -m pip"):
+            tools.execute_command("python -m pip install requests")
+
+    def test_command_output_capped(self, temp_dir, monkeypatch):
+        """Test large command output is cut to the limit with a note"""
+        monkeypatch.setattr("core.agent_tools.COMMAND_OUTPUT_LIMIT", 100)
+        tools = AgentTools(str(temp_dir), allowed_commands=["yes"])
+
+        result = tools.execute_command("yes | head -c 5000")
+
+        assert result["success"]
+        assert result["stdout"].startswith("y\n" * 50)
+        assert result["stdout"].endswith("[output truncated, 5000 bytes in total]")
+
+    def test_command_timeout(self, temp_dir, monkeypatch):
+        """Test a command running past the timeout is killed"""
+        monkeypatch.setattr("core.agent_tools.COMMAND_TIMEOUT", 0.2)
+        tools = AgentTools(str(temp_dir), allowed_commands=["sleep"])
+
+        started = time.monotonic()
+        result = tools.execute_command("sleep 5")
+
+        assert time.monotonic() - started < 2.0
+        assert result == {"success": False, "error": "Command timed out after 0.2 seconds"}
+
+    def test_command_timeout_kills_children(self, temp_dir, monkeypatch):
+        """Test a timeout also kills processes the command started in the background"""
+        monkeypatch.setattr("core.agent_tools.COMMAND_TIMEOUT", 0.2)
+        tools = AgentTools(str(temp_dir), allowed_commands=["sleep"])
+
+        result = tools.execute_command("sleep 7.31 & sleep 7.32; wait")
+
+        assert result["error"] == "Command timed out after 0.2 seconds"
+        time.sleep(0.1)
+        leftovers = [
+            p for p in psutil.process_iter(["cmdline", "status"])
+            if p.info["cmdline"] and p.info["cmdline"][-1] in ("7.31", "7.32")
+            and p.info["status"] != psutil.STATUS_ZOMBIE
+        ]
+        assert leftovers == []
+
+    def test_empty_command(self, temp_dir):
+        """Test empty commands are rejected"""
+        tools = AgentTools(str(temp_dir))
+        with pytest.raises(ValueError, match="Empty command"):
+            tools.execute_command("   ")
+
+
+class TestAgentToolsFiles:
+    """Test file system tools"""
+
+    def test_validate_path_allowed_paths(self, temp_dir):
+        """Test paths under an allowed path pass and other outside paths don't"""
+        workspace = temp_dir / "workspace"
+        shared = temp_dir / "shared"
+        workspace.mkdir()
+        shared.mkdir()
+        tools = AgentTools(str(workspace), allowed_paths=[str(shared)])
+
+        assert tools._validate_path("src/main.py") == workspace.resolve() / "src" / "main.py"
+        assert tools._validate_path(str(shared / "notes.md")) == shared.resolve() / "notes.md"
+        with pytest.raises(ValueError, match="outside workspace"):
+            tools._validate_path(str(temp_dir / "sharedfile.txt"))
+
+    def test_list_files(self, temp_dir):
+        """Test files and visible directories are listed relative to the workspace"""
+        (temp_dir / "src" / "pkg").mkdir(parents=True)
+        (temp_dir / ".git").mkdir()
+        (temp_dir / "README.md").write_text("readme")
+        (temp_dir / "src" / "main.py").write_text("main")
+        tools = AgentTools(str(temp_dir))
+
+        assert tools.list_files() == ["README.md", "src/"]
+        assert tools.list_files("src") == ["src/main.py", "src/pkg/"]
+
+    def test_list_files_symlinked_workspace(self, temp_dir, monkeypatch):
+        """Test listing works when the workspace path is a symlink or relative"""
+        real = temp_dir / "real"
+        (real / "src").mkdir(parents=True)
+        (real / "src" / "main.py").write_text("main")
+        (temp_dir / "link").symlink_to(real)
+
+        assert AgentTools(str(temp_dir / "link")).list_files("src") == ["src/main.py"]
+
+        monkeypatch.chdir(temp_dir)
+        assert AgentTools("real").list_files() == ["src/"]
+
+    def test_read_and_write_bytes(self, temp_dir):
+        """Test raw bytes pass through unchanged"""
+        tools = AgentTools(str(temp_dir))
+        data = b"\x89PNG\r\n\x1a\n\xff"
+
+        tools.write_bytes("img/logo.png", data)
+        assert tools.read_bytes("img/logo.png") == data
+
+    def test_read_file_replaces_invalid_utf8(self, temp_dir):
+        """Test text reads don't fail on bytes that aren't valid UTF-8"""
+        (temp_dir / "latin1.txt").write_bytes("café".encode("latin-1"))
+        tools = AgentTools(str(temp_dir))
+
+        assert tools.read_file("latin1.txt") == "caf\ufffd"
+        assert tools.read_file("latin1.txt", encoding="latin-1") == "café"
+
+    def test_write_file(self, temp_dir):
+        """Test text is written as UTF-8"""
+        tools = AgentTools(str(temp_dir))
+
+        tools.write_file("notes.txt", "naïve")
+        assert (temp_dir / "notes.txt").read_bytes() == "naïve".encode("utf-8")
+
+    def test_get_files_info(self, temp_dir):
+        """Test file info is returned for several paths at once"""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "README.md").write_text("readme")
+        tools = AgentTools(str(temp_dir))
+
+        infos = tools.get_files_info(["README.md", "src", "missing.txt", "../outside.txt"])
+
+        assert infos["README.md"]["is_file"] and infos["README.md"]["size"] == 6
+        assert infos["src"]["is_dir"] and infos["src"]["relative_path"] == "src"
+        assert infos["missing.txt"] == {"exists": False}
+        assert "outside workspace" in infos["../outside.txt"]["error"]
+
+    def test_list_files_not_a_directory(self, temp_dir):
+        """Test listing a file raises an error"""
+        (temp_dir / "README.md").write_text("readme")
+        tools = AgentTools(str(temp_dir))
+
+        with pytest.raises(ValueError, match="Not a directory"):
+            tools.list_files("README.md")
+        with pytest.raises(ValueError, match="Not a directory"):
+            tools.list_files("missing")
+
+
+class TestAgentToolsSearch:
+    """Test file search"""
+
+    @pytest.fixture
+    def tools(self, temp_dir):
+        """Create tools that search with grep"""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "main.py").write_text("import os\nprint('here')\n")
+        (temp_dir / "notes.txt").write_text("import nothing\n")
+        tools = AgentTools(str(temp_dir))
+        tools._rg_path = None
+        return tools
+
+    def test_search_files(self, tools):
+        """Test matches are returned with workspace-relative paths"""
+        assert tools.search_files("import", "*.py") == [{"file": "src/main.py", "line": "import os"}]
+
+    def test_search_pattern_not_shell_interpreted(self, tools, temp_dir):
+        """Test quotes and shell syntax in the pattern are searched literally"""
+        assert tools.search_files("'; touch pwned; '") == []
+        assert not (temp_dir / "pwned").exists()
+
+    def test_search_result_limit(self, tools, temp_dir, monkeypatch):
+        """Test the search stops once the result limit is reached"""
+        monkeypatch.setattr("core.agent_tools.SEARCH_RESULT_LIMIT", 3)
+        (temp_dir / "many.txt").write_text("hit\n" * 100)
+
+        assert len(tools.search_files("hit")) == 3
+
+    def test_search_skips_dependency_dirs(self, tools, temp_dir):
+        """Test the grep fallback doesn't descend into VCS and dependency directories"""
+        (temp_dir / "node_modules" / "pkg").mkdir(parents=True)
+        (temp_dir / "node_modules" / "pkg" / "index.py").write_text("import os\n")
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".git" / "hook.py").write_text("import os\n")
+
+        assert tools.search_files("import", "*.py") == [{"file": "src/main.py", "line": "import os"}]
+
+    def test_search_non_ascii_pattern(self, tools, temp_dir):
+        """Test UTF-8 patterns still match when grep runs in the C locale"""
+        (temp_dir / "menu.txt").write_text("café au lait\n")
+
+        assert tools.search_files("café") == [{"file": "menu.txt", "line": "café au lait"}]
+
+    def test_search_extended_regex(self, tools, temp_dir):
+        """Test the grep fallback uses the same extended regex syntax as rg"""
+        (temp_dir / "ops.txt").write_text("foo+bar\nboob\n")
+
+        assert tools.search_files("o+b", "*.txt") == [{"file": "ops.txt", "line": "boob"}]
+
+    def test_search_timeout_reported(self, tools, temp_dir, monkeypatch):
+        """Test a search killed by the timeout says its results are incomplete"""
+        monkeypatch.setattr("core.agent_tools.SEARCH_TIMEOUT", 0.2)
+        slow_search = temp_dir / "slow-rg"
+        slow_search.write_text("#!/bin/sh\nexec sleep 5\n")
+        slow_search.chmod(0o755)
+        tools._rg_path = str(slow_search)
+
+        assert tools.search_files("import") == [
+            {"error": "Search timed out after 0.2 seconds; results are incomplete"}
+        ]
+
+    def test_parse_rg_line(self):
+        """Test ripgrep JSON output is parsed into matches"""
+        match = (
+            b'{"type":"match","data":{"path":{"text":"./src/main.py"},'
+            b'"lines":{"text":"import os\\n"},"line_number":1}}'
+        )
+        assert _parse_rg_line(match) == {"file": "src/main.py", "line": "import os"}
+        assert _parse_rg_line(b'{"type":"begin","data":{"path":{"text":"./a.py"}}}') is None
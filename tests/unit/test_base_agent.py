@@ -0,0 +1,131 @@
+"""Unit tests for BaseAgent"""
+
+import pytest
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from agents.base_agent import BaseAgent
+
+
+class TestBaseAgent:
+    """Test BaseAgent functionality"""
+
+    @pytest.fixture
+    def agent(self, temp_dir, monkeypatch):
+        """Create a test agent with an API key in the environment"""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-api-key")
+        return BaseAgent(
+            agent_name="backend-Test",
+            port=8999,
+            workspace_path=temp_dir / "workspace"
+        )
+
+    @pytest.fixture
+    def mock_async_anthropic(self):
+        """Mock AsyncAnthropic client"""
+        with patch("anthropic.AsyncAnthropic") as mock:
+            client = Mock()
+            response = Mock()
+            response.content = [Mock(text="Test response from Claude")]
+            client.messages.create = AsyncMock(return_value=response)
+            client.close = AsyncMock()
+
+            async def text_stream():
+                for chunk in ("Test ", "stream"):
+                    yield chunk
+
+            @asynccontextmanager
+            async def stream(**kwargs):
+                yield Mock(text_stream=text_stream())
+
+            client.messages.stream = stream
+            mock.return_value = client
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_process_message(self, agent, mock_async_anthropic):
+        """Test message is sent through the async Claude client"""
+        response = await agent.process_message("Hello")
+
+        assert response == "Test response from Claude"
+        client = mock_async_anthropic.return_value
+        client.messages.create.assert_awaited_once()
+        assert client.messages.create.call_args[1]["messages"][0]["content"] == "Hello"
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_messages(self, agent, mock_async_anthropic):
+        """Test the Claude client is created once and reused"""
+        await agent.process_message("First")
+        await agent.process_message("Second")
+
+        mock_async_anthropic.assert_called_once()
+        assert mock_async_anthropic.return_value.messages.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_message(self, agent, mock_async_anthropic):
+        """Test reply text is yielded chunk by chunk"""
+        chunks = [chunk async for chunk in agent.stream_message("Hello")]
+        assert chunks == ["Test ", "stream"]
+
+    def test_ask_stream_endpoint(self, agent, mock_async_anthropic):
+        """Test streaming endpoint emits server-sent events"""
+        client = TestClient(agent.app)
+        response = client.post("/ask/stream", json={"message": "Hello"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            'data: {"text": "Test "}\n\n'
+            'data: {"text": "stream"}\n\n'
+            "event: done\ndata: {}\n\n"
+        )
+
+    def test_system_prompt_built_once(self, agent):
+        """Test the system prompt is built on first use and then reused"""
+        with patch.object(agent, "build_system_prompt", return_value="Prompt") as build:
+            assert agent.get_system_prompt() == "Prompt"
+            assert agent.get_system_prompt() == "Prompt"
+        build.assert_called_once()
+
+    def test_api_key_from_config_cached(self, agent, temp_dir, monkeypatch):
+        """Test API key is read from config.json once and then cached"""
+        monkeypatch.delenv("ANTHROPIC_API_KEY")
+        monkeypatch.setenv("DEVTEAM_HOME", str(temp_dir))
+        config_file = temp_dir / "config.json"
+        config_file.write_text('{"tokens": {"anthropic_api_key": "config-key"}}')
+
+        assert agent._get_api_key() == "config-key"
+        config_file.unlink()
+        assert agent._get_api_key() == "config-key"
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key(self, agent, temp_dir, monkeypatch):
+        """Test a helpful error is returned when no API key is configured"""
+        monkeypatch.delenv("ANTHROPIC_API_KEY")
+        monkeypatch.setenv("DEVTEAM_HOME", str(temp_dir))
+
+        response = await agent.process_message("Hello")
+        assert "No Anthropic API key configured" in response
+        assert agent._api_key is None
+
+    @pytest.mark.asyncio
+    async def test_close_releases_client(self, agent, mock_async_anthropic):
+        """Test close shuts down the shared client"""
+        await agent.process_message("Hello")
+        await agent.close()
+
+        mock_async_anthropic.return_value.close.assert_awaited_once()
+        assert agent._anthropic is None
+
+    @pytest.mark.asyncio
+    async def test_telegram_session_reused(self, agent):
+        """Test the Telegram session is shared until the agent is closed"""
+        session = agent._get_telegram_session()
+        assert agent._get_telegram_session() is session
+
+        await agent.close()
+        assert session.closed
+        assert agent._telegram_session is None
+
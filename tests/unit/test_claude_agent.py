@@ -5,7 +5,7 @@ from datetime import datetime
 from unittest.mock import Mock, patch
 from pathlib import Path
 
-from core.claude_agent import ClaudeAgent, AgentSettings, AgentRole, Task, TaskStatus, AgentState
+from core.claude_agent import ClaudeAgent, AgentSettings, AgentRole, Task, TaskStatus, AgentState, MAX_MESSAGE_HISTORY
 
 
 class TestClaudeAgent:
@@ -165,7 +165,7 @@ class TestClaudeAgent:
                 _env_file=None
             )
             
-            with patch('anthropic.Anthropic'):
+            with patch('anthropic.AsyncAnthropic'):
                 with patch('core.claude_agent.ConversationHistory'):
                     agent = ClaudeAgent(settings)
                     prompt = agent._generate_default_prompt()
@@ -174,6 +174,14 @@ class TestClaudeAgent:
                     assert f"# ROLE: {role.value}" in prompt
                     assert expected_text in prompt
                 
+    def test_message_history_capped(self, claude_agent):
+        """Test stored message history is bounded"""
+        for i in range(MAX_MESSAGE_HISTORY + 10):
+            claude_agent.state.messages.append({"user_message": f"msg{i}"})
+            
+        assert len(claude_agent.state.messages) == MAX_MESSAGE_HISTORY
+        assert claude_agent.state.messages[0]["user_message"] == "msg10"
+        
     def test_state_persistence(self, claude_agent):
         """Test that agent state is properly maintained"""
         # Initial state
@@ -0,0 +1,53 @@
+"""Unit tests for the agent config file cache"""
+
+import os
+
+import pytest
+
+from agents._config_cache import load_json, read_text
+
+
+def bump_mtime(path):
+    """Move a file's mtime forward so the cache sees a new version"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestConfigCache:
+    """Test mtime-keyed config caching"""
+    
+    def test_load_json_cached(self, temp_dir):
+        """Test unchanged files are parsed once and shared"""
+        config_file = temp_dir / "config.json"
+        config_file.write_text('{"name": "demo"}')
+        
+        first = load_json(config_file)
+        assert first == {"name": "demo"}
+        assert load_json(str(config_file)) is first
+        
+    def test_load_json_reloads_on_change(self, temp_dir):
+        """Test a modified file is parsed again"""
+        config_file = temp_dir / "config.json"
+        config_file.write_text('{"name": "demo"}')
+        load_json(config_file)
+        
+        config_file.write_text('{"name": "changed"}')
+        bump_mtime(config_file)
+        assert load_json(config_file) == {"name": "changed"}
+        
+    def test_read_text_reloads_on_change(self, temp_dir):
+        """Test text files are re-read only after they change"""
+        claude_md = temp_dir / "CLAUDE.md"
+        claude_md.write_text("# First")
+        assert read_text(claude_md) == "# First"
+        
+        claude_md.write_text("# Second")
+        bump_mtime(claude_md)
+        assert read_text(claude_md) == "# Second"
+        
+    def test_missing_file(self, temp_dir):
+        """Test missing files raise FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            load_json(temp_dir / "missing.json")
+        with pytest.raises(FileNotFoundError):
+            read_text(temp_dir / "missing.md")
@@ -0,0 +1,114 @@
+"""Unit tests for ConversationHistory"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import patch
+
+from core.conversation_history import ConversationHistory, _read_tail_lines
+
+
+class TestConversationHistory:
+    """Test JSON Lines conversation history storage"""
+
+    @pytest.fixture
+    def history(self, temp_dir):
+        """Create a history store in a temp directory"""
+        return ConversationHistory(str(temp_dir / "conversations"))
+
+    def test_add_message_appends_line(self, history):
+        """Test each message is appended as one JSON line"""
+        history.add_message("backend", "Hello", "Hi")
+        history.add_message("backend", "Build it", "Done")
+
+        lines = history.get_agent_history_file("backend").read_text().splitlines()
+        assert [json.loads(line)["user_message"] for line in lines] == ["Hello", "Build it"]
+        assert [m["agent_response"] for m in history.load_agent_history("backend")] == ["Hi", "Done"]
+
+    def test_load_keeps_last_messages(self, history, monkeypatch):
+        """Test only the newest messages are loaded, and the file is compacted once large"""
+        monkeypatch.setattr("core.conversation_history.HISTORY_LIMIT", 5)
+        monkeypatch.setattr("core.conversation_history.HISTORY_COMPACT_BYTES", 2000)
+        for i in range(30):
+            history.add_message("backend", f"message {i}", "ok")
+
+        loaded = history.load_agent_history("backend")
+        assert [m["user_message"] for m in loaded] == [f"message {i}" for i in range(25, 30)]
+        assert len(history.get_agent_history_file("backend").read_text().splitlines()) < 30
+
+    def test_large_messages_not_compacted_every_append(self, history, monkeypatch):
+        """Test a tail bigger than the compaction size doesn't rewrite the file on each append"""
+        monkeypatch.setattr("core.conversation_history.HISTORY_LIMIT", 5)
+        monkeypatch.setattr("core.conversation_history.HISTORY_COMPACT_BYTES", 1000)
+        writes = []
+        original_write = history._write_history
+        monkeypatch.setattr(history, "_write_history",
+                            lambda *args: writes.append(args) or original_write(*args))
+        for i in range(40):
+            history.add_message("backend", f"message {i}", "x" * 500)
+
+        # Every append after the first ~1KB is over the compaction size; only a
+        # few of them may rewrite the file
+        assert 1 <= len(writes) <= 5
+        assert len(history.load_agent_history("backend")) == 5
+
+    def test_legacy_migration_checked_once(self, history):
+        """Test the legacy history file is looked for only on a role's first message"""
+        history.add_message("backend", "Hello", "Hi")
+        with patch.object(history, "_migrate_legacy_history") as migrate:
+            history.add_message("backend", "Again", "Hi")
+        migrate.assert_not_called()
+
+    def test_read_tail_lines_across_blocks(self, temp_dir, monkeypatch):
+        """Test lines split over block boundaries are read whole"""
+        monkeypatch.setattr("core.conversation_history.TAIL_BLOCK_SIZE", 7)
+        path = temp_dir / "lines.jsonl"
+        path.write_bytes(b"".join(f"line-{i}\n".encode() for i in range(20)))
+
+        assert _read_tail_lines(path, 3) == [b"line-17", b"line-18", b"line-19"]
+        assert len(_read_tail_lines(path, 100)) == 20
+
+    def test_skips_corrupt_line(self, history):
+        """Test a half-written line doesn't hide the rest of the history"""
+        history.add_message("backend", "Hello", "Hi")
+        with open(history.get_agent_history_file("backend"), "ab") as f:
+            f.write(b'{"timestamp": "20\n')
+
+        assert [m["user_message"] for m in history.load_agent_history("backend")] == ["Hello"]
+
+    def test_legacy_history_migrated(self, history):
+        """Test a JSON array history file is read and converted on the next message"""
+        legacy = history.storage_dir / "backend_history.json"
+        legacy.write_text(json.dumps([
+            {"timestamp": datetime.now().isoformat(), "user_message": "Old", "agent_response": "Yes"}
+        ]))
+        assert history.load_agent_history("backend")[0]["user_message"] == "Old"
+
+        history.add_message("backend", "New", "Ok")
+
+        assert not legacy.exists()
+        assert [m["user_message"] for m in history.load_agent_history("backend")] == ["Old", "New"]
+        assert history.get_all_agents_summary()["backend"]["message_count"] == 2
+
+    def test_recent_context_stops_at_cutoff(self, history):
+        """Test only messages newer than the cutoff are included"""
+        old = (datetime.now() - timedelta(hours=48)).isoformat()
+        with open(history.get_agent_history_file("backend"), "wb") as f:
+            f.write(json.dumps({"timestamp": old, "user_message": "Stale", "agent_response": ""}).encode() + b"\n")
+        history.add_message("backend", "Fresh", "Reply")
+
+        context = history.get_recent_context("backend", hours=24)
+        assert "Fresh" in context
+        assert "Stale" not in context
+
+    def test_task_context_matches_keywords(self, history):
+        """Test messages mentioning task keywords in any case are picked up"""
+        history.add_message("backend", "Please FIX the login", "On it")
+        history.add_message("backend", "Good morning", "Morning")
+        history.add_message("backend", "Status?", "The new Feature is ready")
+
+        context = history.get_task_context("backend")
+        assert "Please FIX the login" in context
+        assert "Status?" in context
+        assert "Good morning" not in context
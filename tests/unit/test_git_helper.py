@@ -0,0 +1,28 @@
+"""Unit tests for GitHelper"""
+
+from unittest.mock import patch
+
+from core.git_helper import GitHelper, get_git_helper
+
+
+class TestGetGitHelper:
+    """Test shared GitHelper instances"""
+
+    def test_same_workspace_shares_helper(self, temp_dir):
+        """Test helpers are reused for the same workspace and config"""
+        config = {"default_branch": "main"}
+        with patch.object(GitHelper, "setup_git_config") as setup:
+            first = get_git_helper(str(temp_dir), config)
+            second = get_git_helper(str(temp_dir / "."), dict(config))
+
+        assert first is second
+        setup.assert_called_once()
+
+    def test_different_config_gets_new_helper(self, temp_dir):
+        """Test a different git config creates a separate helper"""
+        with patch.object(GitHelper, "setup_git_config"):
+            first = get_git_helper(str(temp_dir), {"default_branch": "main"})
+            second = get_git_helper(str(temp_dir), {"default_branch": "develop"})
+
+        assert first is not second
+        assert second.git_config["default_branch"] == "develop"
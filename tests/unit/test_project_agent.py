@@ -0,0 +1,99 @@
+"""Unit tests for ProjectAgent tool request parsing"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from agents.run_project_agent import ProjectAgent, _scan_tool_requests
+
+
+class TestScanToolRequests:
+    """Test tool request scanning"""
+
+    def test_plain_text(self):
+        """Test a reply without tool requests is returned as remaining text"""
+        entries, remaining = _scan_tool_requests("Just a reply")
+        assert entries == []
+        assert remaining == "Just a reply"
+
+    def test_requests_with_surrounding_text(self):
+        """Test requests are decoded and the text around them is kept"""
+        response = (
+            'Reading first\n{"tool": "read_file", "path": "a.py"}\n'
+            'then {"tool": "list_files", "directory": "src"}\nDone'
+        )
+        entries, remaining = _scan_tool_requests(response)
+
+        assert entries == [
+            ("Reading first", {"tool": "read_file", "path": "a.py"}, "read_file"),
+            ("then", {"tool": "list_files", "directory": "src"}, "list_files"),
+        ]
+        assert remaining == "Done"
+
+    def test_escaped_and_raw_newlines_in_content(self):
+        """Test content parses whether or not its newlines are escaped"""
+        escaped = '{"tool": "write_file", "path": "a", "content": "x\\ny"}'
+        raw = '{"tool": "write_file", "path": "a", "content": "x\ny"}'
+
+        for response in (escaped, raw):
+            entries, _ = _scan_tool_requests(response)
+            assert entries[0][1]["content"] == "x\ny"
+
+    def test_braces_inside_content(self):
+        """Test braces and nested tool text inside strings do not end the request"""
+        response = '{"tool": "write_file", "path": "a", "content": "{\\"tool\\": \\"x\\"} }"} after'
+        entries, remaining = _scan_tool_requests(response)
+
+        assert len(entries) == 1
+        assert entries[0][1]["content"] == '{"tool": "x"} }'
+        assert remaining == "after"
+
+    def test_malformed_request(self):
+        """Test a malformed request keeps its name and its text is dropped"""
+        response = 'Before {"tool": "commit_changes", oops} after'
+        entries, remaining = _scan_tool_requests(response)
+
+        assert entries == [("Before", None, "commit_changes")]
+        assert remaining == "after"
+
+    def test_malformed_request_before_valid_one(self):
+        """Test malformed request text doesn't leak into the next request's prefix"""
+        response = 'Start {"tool": "read_file", path} then {"tool": "list_files"} end'
+        entries, remaining = _scan_tool_requests(response)
+
+        assert entries == [
+            ("Start", None, "read_file"),
+            ("then", {"tool": "list_files"}, "list_files"),
+        ]
+        assert remaining == "end"
+
+
+class TestExecuteTool:
+    """Test tool dispatch"""
+
+    @pytest.fixture
+    def agent(self):
+        """Create a ProjectAgent with mocked tools, skipping server setup"""
+        agent = ProjectAgent.__new__(ProjectAgent)
+        agent.name = "backend-alex"
+        agent.tools = Mock()
+        agent.git_helper = Mock()
+        agent._branch_status_cache = None
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool_names(self, agent):
+        """Test unknown and non-string tool names return an error"""
+        assert await agent.execute_tool("nope", {}) == {"error": "Unknown tool: nope"}
+        assert await agent.execute_tool(["x"], {}) == {"error": "Unknown tool: ['x']"}
+
+    @pytest.mark.asyncio
+    async def test_execute_scanned_requests(self, agent):
+        """Test scanned requests with odd tool values run alongside valid ones"""
+        agent.tools.read_file.return_value = "contents"
+        entries, _ = _scan_tool_requests(
+            '{"tool": ["x"], "path": "a"} {"tool": "read_file", "path": "a"} {"tool": "oops",'
+        )
+
+        results = await agent.execute_tool_requests([entry[1] for entry in entries])
+        assert results == [{"error": "Unknown tool: ['x']"}, "contents", None]
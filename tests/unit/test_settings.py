@@ -0,0 +1,35 @@
+"""Unit tests for Settings"""
+
+import pytest
+from pydantic import ValidationError
+
+from config.settings import Settings
+
+
+class TestSettings:
+    """Test derived settings values"""
+
+    def test_github_repo_parts(self):
+        """Test the owner and repository name are split from github_repo"""
+        settings = Settings(anthropic_api_key="key", github_repo="acme/widgets", _env_file=None)
+        assert settings.github_owner == "acme"
+        assert settings.github_repo_name == "widgets"
+
+        settings = Settings(anthropic_api_key="key", github_repo="widgets", _env_file=None)
+        assert settings.github_owner is None
+        assert settings.github_repo_name == "widgets"
+
+    def test_agent_ports(self):
+        """Test agent ports come from the port fields, with a fallback for unknown roles"""
+        settings = Settings(anthropic_api_key="key", backend_port=9999, _env_file=None)
+        assert settings.get_agent_port("backend") == 9999
+        assert settings.get_agent_port("frontend") == 8302
+        assert settings.get_agent_port("designer") == 8300
+
+    def test_settings_frozen(self):
+        """Test fields can't change after the cached port map is built"""
+        settings = Settings(anthropic_api_key="key", _env_file=None)
+        assert settings.get_agent_port("backend") == 8301
+        with pytest.raises(ValidationError):
+            settings.backend_port = 9999
+        assert settings.get_agent_port("backend") == 8301
@@ -0,0 +1,229 @@
+"""Unit tests for ToolEnabledAgent"""
+
+import asyncio
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from agents import tool_agent as tool_agent_module
+from agents.tool_agent import ToolEnabledAgent
+
+
+class TestToolEnabledAgent:
+    """Test ToolEnabledAgent functionality"""
+
+    @pytest.fixture
+    def tool_agent(self, temp_dir):
+        """Create a tool agent with mocked tools and git helper"""
+        agent = Mock()
+        agent.settings.role.value = "backend"
+        with patch("agents.tool_agent.AgentTools"):
+            tool_agent = ToolEnabledAgent(agent, str(temp_dir), {})
+        tool_agent.tools.resolve_path.return_value = temp_dir / "a.py"
+        tool_agent.tools.read_file.return_value = "file contents"
+        tool_agent.tools.list_files.return_value = ["a.py"]
+        return tool_agent
+
+    @pytest.mark.asyncio
+    async def test_response_without_tools(self, tool_agent):
+        """Test plain responses are returned unchanged"""
+        tool_agent.agent.process_message = AsyncMock(return_value="Just text")
+        assert await tool_agent.process_with_tools("Hi") == "Just text"
+
+    @pytest.mark.asyncio
+    async def test_tool_directives_executed(self, tool_agent):
+        """Test TOOL: lines are parsed and their results appended"""
+        tool_agent.agent.process_message = AsyncMock(return_value=(
+            'Let me look\n'
+            'TOOL:read_file:{"path": "a.py"}\n'
+            'Not a TOOL:directive\n'
+            'TOOL:list_files:{"directory": "."}'
+        ))
+
+        response = await tool_agent.process_with_tools("Hi")
+
+        assert response.endswith(
+            "--- Tool Results ---\n"
+            "Result of read_file: file contents\n"
+            "Result of list_files: ['a.py']"
+        )
+        tool_agent.tools.read_file.assert_called_once_with("a.py")
+
+    @pytest.mark.asyncio
+    async def test_read_only_tools_gathered(self, tool_agent):
+        """Test consecutive read-only tools overlap while writes run on their own"""
+        running = []
+        overlapped = []
+
+        async def execute_tool(tool_name, params):
+            running.append(tool_name)
+            await asyncio.sleep(0)
+            overlapped.append(list(running))
+            running.remove(tool_name)
+            return tool_name
+
+        tool_agent.execute_tool = execute_tool
+        results = await tool_agent.execute_tools([
+            ("read_file", {}), ("list_files", {}), ("write_file", {}), ("read_file", {})
+        ])
+
+        assert results == ["read_file", "list_files", "write_file", "read_file"]
+        assert overlapped == [
+            ["read_file", "list_files"], ["list_files"], ["write_file"], ["read_file"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalid_params_reported(self, tool_agent):
+        """Test invalid JSON params are reported as errors"""
+        tool_agent.agent.process_message = AsyncMock(return_value="TOOL:read_file:{bad json}")
+
+        response = await tool_agent.process_with_tools("Hi")
+        assert "Error executing read_file:" in response
+
+    @pytest.mark.asyncio
+    async def test_repeated_message_cached(self, tool_agent, monkeypatch):
+        """Test an identical message within the TTL reuses a reply that ran no tools"""
+        monkeypatch.setattr(tool_agent_module, "RESPONSE_CACHE_TTL", 30.0)
+        tool_agent.agent.process_message = AsyncMock(return_value="Just text")
+
+        first = await tool_agent.process_with_tools("Hi")
+        assert await tool_agent.process_with_tools("Hi") == first
+        tool_agent.agent.process_message.assert_awaited_once()
+
+        await tool_agent.process_with_tools("Hello")
+        assert tool_agent.agent.process_message.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tool_replies_not_cached(self, tool_agent, monkeypatch):
+        """Test replies that ran tools are produced again, so tool results are never stale"""
+        monkeypatch.setattr(tool_agent_module, "RESPONSE_CACHE_TTL", 30.0)
+        tool_agent.agent.process_message = AsyncMock(return_value='TOOL:read_file:{"path": "a.py"}')
+
+        await tool_agent.process_with_tools("Hi")
+        await tool_agent.process_with_tools("Hi")
+        assert tool_agent.agent.process_message.await_count == 2
+        assert tool_agent.tools.read_file.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_response_cache_disabled(self, tool_agent):
+        """Test the cache is off by default and every message goes to the model"""
+        tool_agent.agent.process_message = AsyncMock(return_value="Just text")
+
+        with patch("agents.tool_agent.hashlib.blake2b") as blake2b:
+            await tool_agent.process_with_tools("Hi")
+            await tool_agent.process_with_tools("Hi")
+        assert tool_agent.agent.process_message.await_count == 2
+        assert not tool_agent._response_cache
+        blake2b.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_response_cache_bounded(self, tool_agent, monkeypatch):
+        """Test the least recently used reply is evicted at the size cap"""
+        monkeypatch.setattr(tool_agent_module, "RESPONSE_CACHE_TTL", 30.0)
+        monkeypatch.setattr(tool_agent_module, "RESPONSE_CACHE_SIZE", 2)
+        tool_agent.agent.process_message = AsyncMock(return_value="Just text")
+
+        for message in ("a", "b", "a", "c"):
+            await tool_agent.process_with_tools(message)
+        assert len(tool_agent._response_cache) == 2
+
+        await tool_agent.process_with_tools("a")
+        assert tool_agent.agent.process_message.await_count == 3
+
+    def test_git_helper_created_lazily(self, tool_agent, temp_dir):
+        """Test git setup is deferred until a git tool needs it"""
+        with patch("agents.tool_agent.get_git_helper") as get_git_helper:
+            assert tool_agent._git_helper is None
+            assert tool_agent.git_helper is tool_agent.git_helper
+        get_git_helper.assert_called_once_with(str(temp_dir), {})
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool(self, tool_agent):
+        """Test unknown tools return an error result"""
+        assert await tool_agent.execute_tool("unknown", {}) == {"error": "Unknown tool: unknown"}
+
+
+class TestToolAgentApp:
+    """Test the tool agent endpoints and inline file size limits"""
+
+    @pytest.fixture
+    def tool_agent(self, temp_dir):
+        """Create a tool agent with real file tools and a 1 MB limit"""
+        agent = Mock()
+        agent.settings.role.value = "backend"
+        return ToolEnabledAgent(agent, str(temp_dir), {}, max_file_size_mb=1)
+
+    @pytest.fixture
+    def client(self, tool_agent):
+        """Test client for the tool agent app"""
+        tool_agent_module.app.state.tool_agent = tool_agent
+        return TestClient(tool_agent_module.app)
+
+    def test_ask(self, client, tool_agent):
+        """Test /ask validates the body and returns the processed reply"""
+        tool_agent.agent.process_message = AsyncMock(return_value="Just text")
+
+        response = client.post("/ask", json={"message": "Hi"})
+        assert response.status_code == 200
+        assert response.json() == {"response": "Just text"}
+
+        assert client.post("/ask", json={"message": 42}).status_code == 422
+
+    def test_read_file_stream(self, client, temp_dir, monkeypatch):
+        """Test files are streamed back in chunks"""
+        monkeypatch.setattr(tool_agent_module, "STREAM_CHUNK_SIZE", 4)
+        (temp_dir / "data.bin").write_bytes(b"0123456789")
+
+        response = client.get("/tools/read_file_stream", params={"path": "data.bin"})
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+
+    def test_read_file_stream_missing(self, client):
+        """Test streaming a missing file returns 404"""
+        response = client.get("/tools/read_file_stream", params={"path": "missing.txt"})
+        assert response.status_code == 404
+
+    def test_read_file_stream_outside_workspace(self, client):
+        """Test paths outside the workspace are rejected"""
+        response = client.get("/tools/read_file_stream", params={"path": "/etc/hostname"})
+        assert response.status_code == 403
+
+    def test_write_file_stream(self, client, temp_dir):
+        """Test the request body is written to the target file"""
+        response = client.put(
+            "/tools/write_file_stream", params={"path": "out/data.bin"}, content=b"payload"
+        )
+        assert response.status_code == 200
+        assert (temp_dir / "out" / "data.bin").read_bytes() == b"payload"
+
+    def test_write_file_stream_too_large(self, client, temp_dir):
+        """Test oversized uploads are rejected without leaving a file behind"""
+        (temp_dir / "data.bin").write_bytes(b"original")
+        response = client.put(
+            "/tools/write_file_stream",
+            params={"path": "data.bin"},
+            content=b"x" * (1024 * 1024 + 1)
+        )
+        assert response.status_code == 413
+        assert (temp_dir / "data.bin").read_bytes() == b"original"
+        assert not (temp_dir / "data.bin.part").exists()
+
+    @pytest.mark.asyncio
+    async def test_inline_read_size_limit(self, tool_agent, temp_dir):
+        """Test large files are refused by the in-memory read_file tool"""
+        (temp_dir / "small.txt").write_text("small")
+        (temp_dir / "big.txt").write_bytes(b"x" * (1024 * 1024 + 1))
+
+        assert await tool_agent.execute_tool("read_file", {"path": "small.txt"}) == "small"
+        result = await tool_agent.execute_tool("read_file", {"path": "big.txt"})
+        assert "read_file_stream" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_inline_write_size_limit_in_bytes(self, tool_agent, temp_dir):
+        """Test the inline write limit counts encoded bytes, not characters"""
+        content = "\u00e9" * (512 * 1024 + 1)
+
+        result = await tool_agent.execute_tool("write_file", {"path": "big.txt", "content": content})
+        assert "write_file_stream" in result["error"]
+        assert not (temp_dir / "big.txt").exists()
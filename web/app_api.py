@@ -9,6 +9,7 @@ from datetime import datetime
 import os
 import subprocess
 import socket
+import time
 
 from core.app_config import AppConfig, TokenConfig, GlobalSettings
 from core.project_manager import ProjectManager
@@ -498,47 +499,33 @@ async def start_single_agent(project_id: str, agent_id: str) -> Dict[str, Any]:
         if config.tokens.anthropic_api_key:
             env['ANTHROPIC_API_KEY'] = config.tokens.anthropic_api_key
         
-        # Allocate port dynamically
-        if project_id not in agent_manager.allocated_ports:
-            agent_manager.allocated_ports[project_id] = {}
-        
-        # Try to reuse previously allocated port or get a new one
-        if agent_id in agent_manager.allocated_ports[project_id]:
-            port = agent_manager.allocated_ports[project_id][agent_id]
-            # Verify it's still available
-            import socket
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('', port))
-            except OSError:
-                # Port is taken, allocate a new one
-                port = agent_manager._find_available_port()
-                agent_manager.allocated_ports[project_id][agent_id] = port
-        else:
-            port = agent_manager._find_available_port()
-            agent_manager.allocated_ports[project_id][agent_id] = port
+        # Allocate port dynamically, reusing the previous one if it is free
+        port_lock = agent_manager._allocate_port(project_id, agent_id)
+        port = port_lock.port
         
         env['AGENT_PORT'] = str(port)
         agent_manager._save_port_file()
         
         # Start agent process
-        log_file = config.home_directory / "logs" / f"{project_id}_{agent_id}.log"
-        log_file.parent.mkdir(exist_ok=True)
+        log_file = agent_manager._log_file(f"{project_id}_{agent_id}")
         
-        with open(log_file, 'w') as log:
-            # Get the devteam directory
-            devteam_dir = Path(__file__).parent.parent
-            # Use the poetry environment Python
-            python_path = devteam_dir / '.venv' / 'bin' / 'python'
-            if not python_path.exists():
-                python_path = 'python'
-            process = subprocess.Popen(
-                [str(python_path), 'agents/run_project_agent.py'],
-                env=env,
-                stdout=log,
-                stderr=subprocess.STDOUT,
-                cwd=str(devteam_dir)
-            )
+        try:
+            # Hand the bound socket and the port lock to the agent, as
+            # AgentManager.start_project_agents does, so the port is never free
+            port_lock.sock.listen(128)
+            env['AGENT_LISTEN_FD'] = str(port_lock.sock.fileno())
+            
+            with open(log_file, 'wb', buffering=0) as log:
+                process = subprocess.Popen(
+                    [agent_manager._python_path, 'agents/run_project_agent.py'],
+                    env=env,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    cwd=str(agent_manager._devteam_dir),
+                    pass_fds=(port_lock.fd, port_lock.sock.fileno())
+                )
+        finally:
+            port_lock.release()
         
         # Track the process
         if project_id not in agent_manager.running_processes:
@@ -595,14 +582,12 @@ async def stop_single_agent(project_id: str, agent_id: str) -> Dict[str, Any]:
         if hasattr(process, 'terminate'):
             process.terminate()
             # Wait a bit for graceful shutdown
-            import time
             time.sleep(0.5)
             if process.poll() is None:
                 process.kill()
         elif isinstance(process, int):
             # It's a PID
             os.kill(process, 15)  # SIGTERM
-            import time
             time.sleep(0.5)
             try:
                 os.kill(process, 9)  # SIGKILL if still running
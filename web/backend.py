@@ -37,6 +37,8 @@ app.include_router(workspace_router)
 # Global instances
 orchestrator: Optional[AgentOrchestrator] = None
 agent_manager: Optional[AgentManager] = None
+# Shared across requests so agent calls reuse keep-alive connections
+http_client: Optional[httpx.AsyncClient] = None
 
 # Agent ports mapping
 AGENT_PORTS = {
@@ -71,36 +73,46 @@ class SystemConfig(BaseModel):
     anthropic_api_key: str
 
 
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client used to talk to agents"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    return http_client
+
+
 async def check_agent_health(role: str, port: int) -> Dict[str, Any]:
     """Check if an agent is running on a given port"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://localhost:{port}/", timeout=2.0)
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Get more detailed status if available
-                try:
-                    status_response = await client.get(f"http://localhost:{port}/status", timeout=2.0)
-                    status_data = status_response.json() if status_response.status_code == 200 else {}
-                except:
-                    status_data = {}
-                
-                return {
-                    "role": role,
-                    "port": port,
-                    "model": "claude-3-5-sonnet-20241022",
-                    "current_task": status_data.get("current_task"),
-                    "task_history_count": len(status_data.get("task_history", [])),
-                    "last_activity": status_data.get("last_activity", "Unknown"),
-                    "total_tokens_used": status_data.get("total_tokens_used", 0),
-                    "health": "running",
-                    "process": {
-                        "pid": None,
-                        "status": "running",
-                        "uptime": None
-                    }
+        client = get_http_client()
+        response = await client.get(f"http://localhost:{port}/", timeout=2.0)
+        if response.status_code == 200:
+            data = response.json()
+            
+            # Get more detailed status if available
+            try:
+                status_response = await client.get(f"http://localhost:{port}/status", timeout=2.0)
+                status_data = status_response.json() if status_response.status_code == 200 else {}
+            except:
+                status_data = {}
+            
+            return {
+                "role": role,
+                "port": port,
+                "model": "claude-3-5-sonnet-20241022",
+                "current_task": status_data.get("current_task"),
+                "task_history_count": len(status_data.get("task_history", [])),
+                "last_activity": status_data.get("last_activity", "Unknown"),
+                "total_tokens_used": status_data.get("total_tokens_used", 0),
+                "health": "running",
+                "process": {
+                    "pid": None,
+                    "status": "running",
+                    "uptime": None
                 }
+            }
     except:
         pass
     
@@ -138,8 +150,12 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    global http_client
     if orchestrator:
         await orchestrator.shutdown()
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
 
 
 @app.post("/api/system/initialize")
@@ -243,22 +259,21 @@ async def assign_task(request: TaskAssignRequest):
         raise HTTPException(status_code=404, detail=f"Unknown agent role: {request.agent_role}")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://localhost:{port}/assign",
-                json={
-                    "id": f"task_{request.agent_role}_{asyncio.get_event_loop().time()}",
-                    "title": request.task_title,
-                    "description": request.task_description,
-                    "github_issue_number": request.github_issue_number
-                },
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to assign task")
+        response = await get_http_client().post(
+            f"http://localhost:{port}/assign",
+            json={
+                "id": f"task_{request.agent_role}_{asyncio.get_event_loop().time()}",
+                "title": request.task_title,
+                "description": request.task_description,
+                "github_issue_number": request.github_issue_number
+            },
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise HTTPException(status_code=response.status_code, detail="Failed to assign task")
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Agent not available: {str(e)}")
 